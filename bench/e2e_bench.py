@@ -0,0 +1,182 @@
+"""End-to-end benchmark of the ``main.py`` flow against local stand-ins.
+
+Starts a replaying OA portal, a fake GLM endpoint and an SMTP sink (see
+``bench/standins.py``), points the configuration at them and runs
+``main.main`` for N notices and M recipients. The report is JSON::
+
+    uv run python bench/e2e_bench.py --notices 40 --recipients 200 --output bench.json
+
+Real credentials in ``env`` are never used: every endpoint and account is
+overridden through environment variables before the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import inspect
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from bench.standins import FakeGLM, OAPortal, SMTPSink  # noqa: E402
+
+
+class StageTimer:
+    """Record wall-clock latency of selected methods, grouped by stage name."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, owner: type, attribute: str, stage: str | None = None, classify=None) -> None:
+        original = getattr(owner, attribute)
+        timer = self
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                name = classify(*args, **kwargs) if classify else stage
+                timer.add(name, time.perf_counter() - started)
+
+        if isinstance(inspect.getattr_static(owner, attribute), staticmethod):
+            setattr(owner, attribute, staticmethod(timed))
+        else:
+            setattr(owner, attribute, timed)
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def report(self) -> dict[str, dict[str, float]]:
+        return {stage: summarize(values) for stage, values in sorted(self.samples.items())}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "total_ms": round(sum(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="使用本地替身服务对完整流程做基准测试")
+    parser.add_argument("--notices", type=int, default=40, help="目标日期的通知数量 N")
+    parser.add_argument("--recipients", type=int, default=50, help="收件人数量 M")
+    parser.add_argument("--date", default="2025-09-25", help="模拟的目标日期")
+    parser.add_argument("--ai-latency", type=float, default=0.2, help="假 GLM 平均延迟（秒）")
+    parser.add_argument("--ai-jitter", type=float, default=0.05, help="假 GLM 延迟标准差（秒）")
+    parser.add_argument("--ai-error-rate", type=float, default=0.0, help="假 GLM 返回 503 的概率")
+    parser.add_argument("--recordings", type=Path, help="回放的详情页目录（*.html）")
+    parser.add_argument("--pipeline", action="store_true", help="使用 main.py --pipeline 流水线模式")
+    parser.add_argument("--engine", choices=["thread", "async"], help="详情与摘要引擎（同 main.py --engine）")
+    parser.add_argument("--output", type=Path, help="JSON 报告输出路径，默认只打印")
+    args = parser.parse_args()
+
+    portal = OAPortal(args.date, args.notices, older_date="2000-01-01", recordings=args.recordings)
+    glm = FakeGLM(args.ai_latency, args.ai_jitter, args.ai_error_rate)
+    sink = SMTPSink()
+    for server in (portal, glm, sink):
+        server.start()
+
+    workdir = Path(tempfile.mkdtemp(prefix="oap-bench-"))
+    recipients = workdir / "List.txt"
+    recipients.write_text("\n".join(f"user{index}@bench.local" for index in range(args.recipients)), encoding="utf-8")
+    os.environ.update(
+        {
+            "EVENTS_DIR": str(workdir / "events"),
+            "CACHE_DIR": str(workdir / "cache"),
+            "RECIPIENT_LIST": str(recipients),
+            "OA_BASE_URL": f"http://127.0.0.1:{portal.port}",
+            "AI_URL": f"http://127.0.0.1:{glm.port}/api/paas/v4/chat/completions",
+            "API_KEY": "bench",
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(sink.port),
+            "SMTP_SSL": "0",
+            "SMTP_USER": "bench@bench.local",
+            "SMTP_PASSWORD": "bench",
+        }
+    )
+    os.environ.setdefault("RETRY_BASE_DELAY", "0.05")
+
+    import main as entrypoint
+    from common.metrics import METRICS
+    from sender.Sender import Sender
+    from sender.connection import SMTPConnection
+    from spider.OAP import OA
+
+    timer = StageTimer()
+    timer.wrap(OA, "_post", classify=lambda self, url, *a, **k: "oa_listing" if url == self.listing_url else "oa_detail")
+    timer.wrap(OA, "_clean_html", "clean_html")
+    timer.wrap(OA, "_call_ai", "ai_summary")
+    timer.wrap(Sender, "_assemble_html", "render_digest")
+    timer.wrap(SMTPConnection, "send", "smtp_send")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        entrypoint.main(target_date=args.date, pipeline=args.pipeline, engine=args.engine)
+    finally:
+        wall = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        for server in (portal, glm, sink):
+            server.stop()
+
+    total_requests = portal.requests + glm.requests + sink.messages
+    report = {
+        "config": {
+            "notices": args.notices,
+            "recipients": args.recipients,
+            "pipeline": args.pipeline,
+            "engine": args.engine or "thread",
+            "ai_latency_s": args.ai_latency,
+            "ai_error_rate": args.ai_error_rate,
+        },
+        "wall_time_s": round(wall, 3),
+        "requests": {
+            "oa": portal.requests,
+            "glm": glm.requests,
+            "glm_errors": glm.errors,
+            "smtp_messages": sink.messages,
+            "smtp_recipients": sink.recipients,
+            "smtp_connections": sink.connections,
+        },
+        "requests_per_second": round(total_requests / wall, 2) if wall else None,
+        "notices_per_second": round(args.notices / wall, 2) if wall else None,
+        "peak_python_memory_bytes": peak,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "stages": timer.report(),
+        "metrics": METRICS.snapshot(),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Microbenchmark for OA listing parsing.
+
+Compares the original full-tree ``html.parser`` parse with ``OA._parse_rows``
+(tbody-only parsing, lxml when installed) and checks both yield identical rows::
+
+    uv run python bench/parse_bench.py [saved_listing.html ...]
+
+Without arguments a synthetic page shaped like the portal listing is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import spider.OAP as oap  # noqa: E402
+
+
+def baseline_rows(html: str) -> list[dict[str, str]]:
+    """The pre-optimisation parser: a full ``html.parser`` tree of the page."""
+    soup = BeautifulSoup(html, "html.parser")
+    tbody = soup.find("tbody")
+    if not tbody:
+        return []
+    result = []
+    for row in tbody.find_all("tr", class_="datalight"):
+        cells = row.find_all("td")
+        if len(cells) < 3:
+            continue
+        link = cells[0].find("a")
+        if not link:
+            continue
+        href = link.get("href", "").strip()
+        if not href:
+            continue
+        result.append(
+            {
+                "标题": link.get("title", "").strip() or link.get_text(strip=True),
+                "链接": f"{oap.OA.OA_HOST}{href}",
+                "发布单位": cells[1].get_text(strip=True),
+                "发布日期": cells[2].get_text(strip=True),
+            }
+        )
+    return result
+
+
+def synthetic_listing(rows: int = 50) -> str:
+    head = "".join(
+        f"<script>var cfg{i} = {{menu: '{'x' * 200}'}};</script><link rel='stylesheet' href='/css/{i}.css'>"
+        for i in range(40)
+    )
+    nav = "".join(f"<li><a href='/nav/{i}'>导航菜单项 {i}</a></li>" for i in range(200))
+    body = "".join(
+        f"<tr class='datalight'><td><a href='/seeyon/detail.jsp?id={i}' title='关于开展第{i}期活动的通知'>"
+        f"关于开展第{i}期活动的通知</a></td><td>教务处</td><td>2025-09-{25 - i // 10:02d}</td></tr>"
+        for i in range(rows)
+    )
+    return (
+        f"<html><head>{head}</head><body><ul>{nav}</ul>"
+        f"<table><thead><tr><th>标题</th></tr></thead><tbody>{body}</tbody></table>"
+        f"<div class='footer'>{'版权所有 ' * 500}</div></body></html>"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="比较OA列表页解析耗时")
+    parser.add_argument("pages", nargs="*", type=Path, help="保存的列表页 HTML 文件")
+    parser.add_argument("--number", type=int, default=50, help="每种解析方式的重复次数")
+    args = parser.parse_args()
+
+    pages = [(path.name, path.read_text(encoding="utf-8")) for path in args.pages]
+    if not pages:
+        pages = [("synthetic", synthetic_listing())]
+
+    backends = ["html.parser"] + (["lxml"] if oap.HTML_PARSER == "lxml" else [])
+    for name, html in pages:
+        expected = baseline_rows(html)
+        base = timeit.timeit(lambda: baseline_rows(html), number=args.number) / args.number
+        print(f"{name}: {len(expected)} 行, {len(html) / 1024:.0f} KiB")
+        print(f"  baseline html.parser 全量建树: {base * 1000:.2f} ms")
+        for backend in backends:
+            oap.HTML_PARSER = backend
+            rows = oap.OA._parse_rows(html)
+            if rows != expected:
+                raise SystemExit(f"  {backend}: 解析结果与基线不一致")
+            cost = timeit.timeit(lambda: oap.OA._parse_rows(html), number=args.number) / args.number
+            print(f"  _parse_rows ({backend}): {cost * 1000:.2f} ms, 加速 {base / cost:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Local stand-ins for the OA portal, the GLM chat API and the SMTP server.
+
+Each stand-in runs in a background thread on ``127.0.0.1`` and keeps simple
+counters so the benchmark can report request rates.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# 批量摘要请求中每条通知以【编号】开头（见 OA._batch_payload）
+_BATCH_ITEM = re.compile(r"【(\d+)】\n")
+
+
+class _Server:
+    """Mixin for starting/stopping a stand-in server in a daemon thread."""
+
+    server: socketserver.BaseServer
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OAPortal(_Server):
+    """Serve a listing of ``notices`` rows dated ``date`` plus their detail pages.
+
+    With ``recordings`` pointing at a directory of saved detail pages
+    (``*.html``) those are replayed round-robin instead of synthetic pages.
+    """
+
+    def __init__(self, date: str, notices: int, older_date: str, recordings: Path | None = None) -> None:
+        self.requests = 0
+        self._lock = threading.Lock()
+        recorded = sorted(recordings.glob("*.html")) if recordings else []
+        self._details = [path.read_text(encoding="utf-8") for path in recorded]
+        rows = [(date, index) for index in range(notices)] + [(older_date, notices + index) for index in range(5)]
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                with portal._lock:
+                    portal.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+                url = urlparse(self.path)
+                if url.path.startswith("/login/"):
+                    page_index = int(form.get("pageindex", "1"))
+                    page_size = int(form.get("pagesize", "50"))
+                    chunk = rows[(page_index - 1) * page_size: page_index * page_size]
+                    body = portal.listing(chunk)
+                else:
+                    notice_id = int(parse_qs(url.query).get("id", ["0"])[0])
+                    body = portal.detail(notice_id)
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+
+    @staticmethod
+    def listing(rows: list[tuple[str, int]]) -> str:
+        body = "".join(
+            f"<tr class='datalight'><td><a href='/detail?id={index}' title='关于第{index}项工作的通知'>"
+            f"关于第{index}项工作的通知</a></td><td>单位{index % 7}</td><td>{date}</td></tr>"
+            for date, index in rows
+        )
+        return f"<html><head><script>var x = {{}};</script></head><body><table><tbody>{body}</tbody></table></body></html>"
+
+    def detail(self, notice_id: int) -> str:
+        if self._details:
+            return self._details[notice_id % len(self._details)]
+        paragraphs = "".join(
+            f"<p>第{notice_id}号通知第{line}段：请各单位于九月三十日前完成相关材料的整理与报送工作，联系电话 0754-8650{line:04d}。</p>"
+            for line in range(3 + notice_id % 12)
+        )
+        return (
+            "<html><head><style>body{}</style></head><body><div class='nav'><a href='/'>首页</a></div>"
+            f"<div id='content'>{paragraphs}</div></body></html>"
+        )
+
+
+class FakeGLM(_Server):
+    """Chat-completions endpoint with configurable latency and error rate."""
+
+    def __init__(self, latency: float, jitter: float, error_rate: float, seed: int = 0) -> None:
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        glm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with glm._lock:
+                    glm.requests += 1
+                    delay = max(0.0, glm._random.gauss(glm.latency, glm.jitter))
+                    failed = glm._random.random() < glm.error_rate
+                    if failed:
+                        glm.errors += 1
+                time.sleep(delay)
+                if failed:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                user = request.get("messages", [{}])[-1].get("content", "")
+                summary = f"摘要：{user[:80]}"
+                items = _BATCH_ITEM.split(user)
+                if len(items) > 1:
+                    # 批量请求：按编号返回 JSON 对象，每条摘要与单条请求时相同
+                    numbers, articles = items[1::2], items[2::2]
+                    summary = json.dumps(
+                        {number: f"摘要：{article.strip()[:80]}" for number, article in zip(numbers, articles)},
+                        ensure_ascii=False,
+                    )
+                elif request.get("stream"):
+                    self._stream(summary)
+                    return
+                payload = json.dumps(
+                    {"choices": [{"message": {"role": "assistant", "content": summary}}]}, ensure_ascii=False
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, summary: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for start in range(0, len(summary), 8):
+                    chunk = {"choices": [{"delta": {"content": summary[start:start + 8]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+
+
+class SMTPSink(_Server):
+    """Minimal plaintext SMTP server that accepts AUTH and discards messages."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.recipients = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                with sink._lock:
+                    sink.connections += 1
+                self._reply("220 bench-sink ESMTP")
+                recipients = 0
+                while line := self.rfile.readline():
+                    command = line.decode("utf-8", "replace").strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        self._reply("250-bench-sink", "250-AUTH PLAIN LOGIN", "250 8BITMIME")
+                    elif verb == "HELO":
+                        self._reply("250 bench-sink")
+                    elif verb == "AUTH":
+                        self._reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL":
+                        recipients = 0
+                        self._reply("250 OK")
+                    elif verb == "RCPT":
+                        recipients += 1
+                        self._reply("250 OK")
+                    elif verb == "DATA":
+                        self._reply("354 End data with <CR><LF>.<CR><LF>")
+                        while (data := self.rfile.readline()) and data.rstrip(b"\r\n") != b".":
+                            pass
+                        with sink._lock:
+                            sink.messages += 1
+                            sink.recipients += recipients
+                        self._reply("250 OK queued")
+                    elif verb == "QUIT":
+                        self._reply("221 Bye")
+                        return
+                    else:
+                        self._reply("250 OK")
+
+            def _reply(self, *lines: str) -> None:
+                self.wfile.write("".join(f"{line}\r\n" for line in lines).encode("utf-8"))
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+
+
+__all__ = ["FakeGLM", "OAPortal", "SMTPSink"]
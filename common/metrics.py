@@ -0,0 +1,197 @@
+"""In-process run metrics with Prometheus textfile and JSON export."""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# 延迟直方图的桶上界（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> float | None:
+        """Bucket upper bound containing the ``fraction`` quantile."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+        return float("inf")
+
+
+class Metrics:
+    """Thread-safe counters and latency histograms keyed by name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self._counters: dict[str, dict[LabelKey, float]] = {}
+            self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, _Histogram()).observe(seconds)
+
+    @contextmanager
+    def timed(self, name: str, **labels: str) -> Iterator[None]:
+        """Record ``<name>_seconds``; exceptions also bump ``<name>_failures_total``."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_failures_total", **labels)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "p50_le": histogram.quantile(0.5),
+                        "p90_le": histogram.quantile(0.9),
+                        "p99_le": histogram.quantile(0.99),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {
+            "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "duration_seconds": round(time.time() - self.started, 3),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self, prefix: str = "oap_") -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{prefix}{name}{self._format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip((*BUCKETS, "+Inf"), histogram.counts):
+                        cumulative += count
+                        labels = self._format_labels(key + (("le", str(bound)),))
+                        lines.append(f"{prefix}{name}_bucket{labels} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{self._format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{prefix}{name}_count{self._format_labels(key)} {histogram.count}")
+        lines.append(f"# TYPE {prefix}run_timestamp_seconds gauge")
+        lines.append(f"{prefix}run_timestamp_seconds {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: LabelKey) -> str:
+        if not key:
+            return ""
+        escaped = ",".join(f'{name}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                           for name, value in key)
+        return "{" + escaped + "}"
+
+
+METRICS = Metrics()
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _prune_reports(directory: Path, name: str, keep: int) -> None:
+    # 文件名中的时间戳按字典序即时间顺序
+    reports = sorted(directory.glob(f"{name}-*.json"))
+    for stale in reports[:-keep]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+
+def export_run(config, name: str) -> None:
+    """Write the JSON run report under ``events/metrics/`` and the Prometheus textfile if configured."""
+    if config.metrics_report:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        report = config.events_dir / "metrics" / f"{name}-{stamp}.json"
+        _write_atomic(report, json.dumps(METRICS.snapshot(), ensure_ascii=False, indent=2))
+        print(f"运行指标已写入 {report}")
+        _prune_reports(report.parent, name, config.metrics_report_keep)
+    if config.metrics_textfile:
+        _write_atomic(config.metrics_textfile, METRICS.to_prometheus())
+
+
+@contextmanager
+def profiled(config, name: str) -> Iterator[None]:
+    """Capture a cProfile dump under ``events/metrics/`` when ``OAP_PROFILE`` is enabled."""
+    if not config.profile:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        target = config.events_dir / "metrics" / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(target))
+        print(f"cProfile 结果已写入 {target}")
+
+
+__all__ = ["METRICS", "Metrics", "export_run", "profiled"]
@@ -0,0 +1,47 @@
+"""Thread-safe token bucket shared by the spider and the sender."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` operations per second with bursts up to ``capacity``.
+
+    A non-positive ``rate`` disables limiting so callers can keep the bucket in
+    place unconditionally.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while (wait := self._take(tokens)) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Like :meth:`acquire`, but waits without blocking the event loop."""
+        while (wait := self._take(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+    def _take(self, tokens: float) -> float:
+        """Consume ``tokens`` and return 0, or return how long to wait before trying again."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+__all__ = ["TokenBucket"]
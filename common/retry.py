@@ -0,0 +1,163 @@
+"""Retry policy with exponential backoff, jitter and a per-run deadline."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+from common.metrics import METRICS
+
+T = TypeVar("T")
+
+# 值得重试的 HTTP 状态码：限流、超时与服务端错误
+TRANSIENT_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class HTTPStatusError(Exception):
+    """Raised for a non-200 response so the retry policy can classify it."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None) -> None:
+        super().__init__(f"状态码 {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def transient(self) -> bool:
+        return self.status_code in TRANSIENT_STATUS
+
+
+class DeadlineExceeded(Exception):
+    """The run deadline passed before the operation could be (re)tried."""
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Retry transient failures with full-jitter exponential backoff.
+
+    ``classify`` maps an exception to ``(transient, retry_after)``; only
+    transient errors are retried, and a server supplied ``retry_after`` takes
+    precedence over the computed backoff. Once the run deadline set by
+    :meth:`start_run` has passed no further attempts are made.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        deadline_seconds: float = 0.0,
+    ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+        self._deadline: float | None = None
+        self.retries = 0
+
+    def start_run(self) -> None:
+        self.retries = 0
+        self._deadline = time.monotonic() + self.deadline_seconds if self.deadline_seconds > 0 else None
+
+    def remaining(self) -> float | None:
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
+    def timeout(self, default: float) -> float:
+        """Cap a request timeout so it never outlives the run deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(1.0, min(default, remaining))
+
+    def call(
+        self,
+        func: Callable[[], T],
+        classify: Callable[[Exception], tuple[bool, float | None]],
+        description: str,
+        *,
+        service: str,
+    ) -> T:
+        """Run ``func`` with retries; ``service`` labels the ``retries_total`` metric (``oa`` or ``ai``)."""
+        for attempt in range(1, self.attempts + 1):
+            self._check_deadline(description)
+            try:
+                return func()
+            except Exception as exc:
+                delay = self._retry_delay(attempt, exc, classify, description, service)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[T]],
+        classify: Callable[[Exception], tuple[bool, float | None]],
+        description: str,
+        *,
+        service: str,
+    ) -> T:
+        """Coroutine counterpart of :meth:`call` that sleeps without blocking the event loop."""
+        for attempt in range(1, self.attempts + 1):
+            self._check_deadline(description)
+            try:
+                return await func()
+            except Exception as exc:
+                delay = self._retry_delay(attempt, exc, classify, description, service)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _check_deadline(self, description: str) -> None:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"{description}: 已超过本次运行的截止时间")
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        exc: Exception,
+        classify: Callable[[Exception], tuple[bool, float | None]],
+        description: str,
+        service: str,
+    ) -> float | None:
+        """Seconds to wait before the next attempt, or None when ``exc`` should propagate."""
+        transient, retry_after = classify(exc)
+        if not transient or attempt == self.attempts:
+            return None
+        delay = retry_after if retry_after is not None else self._backoff(attempt)
+        delay = min(delay, self.max_delay)
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        self.retries += 1
+        METRICS.inc("retries_total", service=service)
+        print(f"{description} 第{attempt}次失败: {exc}，{delay:.1f}s 后重试")
+        return delay
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+__all__ = ["DeadlineExceeded", "HTTPStatusError", "RetryPolicy", "TRANSIENT_STATUS", "parse_retry_after"]
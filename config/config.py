@@ -10,6 +10,60 @@ from typing import Optional
 class Config:
     """Load runtime settings from ``env`` and environment variables."""
 
+    # Integer settings: key -> (attribute, minimum accepted value)
+    _INT_SETTINGS: dict[str, tuple[str, int]] = {
+        "SMTP_PORT": ("smtp_port", 1),
+        "SMTP_MAX_PER_CONNECTION": ("smtp_max_per_connection", 1),
+        "SMTP_WORKERS": ("smtp_workers", 1),
+        "SMTP_BCC_BATCH": ("smtp_bcc_batch", 1),
+        "OA_PAGE_SIZE": ("oa_page_size", 1),
+        "OA_WORKERS": ("spider_workers", 1),
+        "OA_CONCURRENCY": ("oa_concurrency", 1),
+        "AI_CONCURRENCY": ("ai_concurrency", 1),
+        "HTTP_POOL_SIZE": ("http_pool_size", 1),
+        "AI_INPUT_MAX_CHARS": ("ai_input_max_chars", 100),
+        "RETRY_ATTEMPTS": ("retry_attempts", 1),
+        "AI_SUMMARY_MAX_CHARS": ("ai_summary_max_chars", 1),
+        "AI_BATCH_ITEM_MAX_CHARS": ("ai_batch_item_max_chars", 1),
+        "AI_BATCH_TOKEN_BUDGET": ("ai_batch_token_budget", 1),
+        "SUMMARY_CACHE_MAX_MB": ("summary_cache_max_mb", 0),
+        "SUMMARY_CACHE_MAX_AGE_DAYS": ("summary_cache_max_age_days", 0),
+        "HTTP_CACHE_MAX_MB": ("http_cache_max_mb", 0),
+        "HTTP_CACHE_TTL_HOURS": ("http_cache_ttl_hours", 0),
+        "WATCH_INTERVAL": ("watch_interval", 10),
+        "WATCH_SEND_THRESHOLD": ("watch_send_threshold", 0),
+        "DEDUP_WINDOW_DAYS": ("dedup_window_days", 0),
+        "OUTBOX_MAX_ATTEMPTS": ("outbox_max_attempts", 1),
+        "LOCAL_SUMMARY_THRESHOLD": ("local_summary_threshold", 0),
+        "LOCAL_SUMMARY_MAX_CHARS": ("local_summary_max_chars", 20),
+        "METRICS_REPORT_KEEP": ("metrics_report_keep", 1),
+    }
+    # Boolean settings: key -> attribute
+    _BOOL_SETTINGS: dict[str, str] = {
+        "OA_INCREMENTAL": "incremental",
+        "AI_BATCH": "ai_batch",
+        "AI_STREAM": "ai_stream",
+        "EVENT_STORE_EXPORT_JSON": "event_store_export_json",
+        "SMTP_SSL": "smtp_ssl",
+        "METRICS_REPORT": "metrics_report",
+        "OAP_PROFILE": "profile",
+        "HTTP_CACHE": "http_cache",
+        "DEDUP": "dedup",
+        "OUTBOX": "outbox",
+        "LOCAL_SUMMARY_FALLBACK": "local_summary_fallback",
+    }
+    # Float settings: key -> attribute (negative values are ignored)
+    _FLOAT_SETTINGS: dict[str, str] = {
+        "SMTP_RATE": "smtp_rate",
+        "SMTP_CONNECTION_RATE": "smtp_connection_rate",
+        "RETRY_BASE_DELAY": "retry_base_delay",
+        "RETRY_MAX_DELAY": "retry_max_delay",
+        "AI_RATE": "ai_rate",
+        "OA_RUN_DEADLINE": "run_deadline",
+        "ASYNC_TASK_TIMEOUT": "async_task_timeout",
+        "DEDUP_THRESHOLD": "dedup_threshold",
+    }
+
     def __init__(self, env_file: str | Path | None = None) -> None:
         self.project_root = Path(__file__).resolve().parents[1]
         default_env = self.project_root / "env"
@@ -18,11 +72,82 @@ class Config:
         # Defaults that work for local development out of the box
         self.events_dir: Path = self.project_root / "events"
         self.recipient_list_file: Path = self.project_root / "List.txt"
+        self.cache_dir: Path = self.project_root / "cache"
+        # Event storage backend: "json" (one file per day) or "sqlite"
+        self.event_store: str = "json"
+        self.event_store_export_json: bool = True
         self.smtp_server: str = "smtp.163.com"
         self.smtp_port: int = 465
+        self.smtp_ssl: bool = True
         self.smtp_user: Optional[str] = None
         self.smtp_password: Optional[str] = None
+        self.smtp_max_per_connection: int = 50
+        # Parallel delivery: connection count, messages/second limits, BCC batch size
+        self.smtp_workers: int = 2
+        self.smtp_rate: float = 0.0
+        self.smtp_connection_rate: float = 0.0
+        self.smtp_bcc_batch: int = 1
+        # Delivery outbox (cache/outbox.sqlite3): skip recipients already mailed, give up after N failures
+        self.outbox: bool = True
+        self.outbox_max_attempts: int = 5
         self.api_key: Optional[str] = None
+        # Endpoint overrides (None keeps the production OA portal / GLM API)
+        self.oa_base_url: Optional[str] = None
+        self.ai_url: Optional[str] = None
+
+        # Listing rows requested per page while paginating
+        self.oa_page_size: int = 50
+        # Concurrency for detail fetching / summarization
+        self.spider_workers: int = 4
+        self.oa_concurrency: int = 4
+        self.ai_concurrency: int = 2
+        # Keep-alive connection pool size per host
+        self.http_pool_size: int = 8
+        # Skip notices already recorded in the seen index
+        self.incremental: bool = True
+        # Retry/backoff shared by OA and AI requests; GLM requests per second; run deadline (seconds)
+        self.retry_attempts: int = 3
+        self.retry_base_delay: float = 1.0
+        self.retry_max_delay: float = 30.0
+        self.ai_rate: float = 0.0
+        self.run_deadline: float = 0.0
+        # Detail/summary engine: "thread" (requests + thread pool) or "async" (aiohttp); per-notice timeout for async
+        self.oa_engine: str = "thread"
+        self.async_task_timeout: float = 0.0
+        # Stream AI responses and stop reading once the summary reaches this length
+        self.ai_stream: bool = False
+        self.ai_summary_max_chars: int = 600
+        # Character budget for the article text sent to the AI
+        self.ai_input_max_chars: int = 3000
+        # Pack short notices into one AI request (budget approximated in characters)
+        self.ai_batch: bool = False
+        self.ai_batch_item_max_chars: int = 400
+        self.ai_batch_token_budget: int = 2000
+        # Local extractive summaries: articles up to this length skip the AI (0 disables), output length,
+        # and whether failed AI calls fall back to them
+        self.local_summary_threshold: int = 120
+        self.local_summary_max_chars: int = 200
+        self.local_summary_fallback: bool = True
+        # Summary cache eviction limits
+        self.summary_cache_max_mb: int = 64
+        self.summary_cache_max_age_days: int = 180
+        # Detail page cache: size limit and reuse window for pages without ETag/Last-Modified
+        self.http_cache: bool = True
+        self.http_cache_max_mb: int = 256
+        self.http_cache_ttl_hours: int = 24
+        # Watch daemon: poll interval (seconds), daily send time (HH:MM, empty disables), early-send threshold
+        self.watch_interval: int = 600
+        self.watch_send_at: str = "06:00"
+        self.watch_send_threshold: int = 0
+        # Near-duplicate notices: history window (days) and MinHash similarity threshold
+        self.dedup: bool = True
+        self.dedup_window_days: int = 14
+        self.dedup_threshold: float = 0.8
+        # Run metrics: JSON report under events/metrics/, optional Prometheus textfile, cProfile dump
+        self.metrics_report: bool = True
+        self.metrics_report_keep: int = 100
+        self.metrics_textfile: Optional[Path] = None
+        self.profile: bool = False
 
         self.load()
 
@@ -40,6 +165,7 @@ class Config:
 
     def ensure_directories(self) -> None:
         self.events_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     @property
     def ai_headers(self) -> dict[str, str]:
@@ -89,11 +215,21 @@ class Config:
         keys = [
             "EVENTS_DIR",
             "RECIPIENT_LIST",
+            "CACHE_DIR",
+            "EVENT_STORE",
+            "OA_ENGINE",
             "SMTP_SERVER",
             "SMTP_PORT",
             "SMTP_USER",
             "SMTP_PASSWORD",
             "API_KEY",
+            "OA_BASE_URL",
+            "AI_URL",
+            "METRICS_TEXTFILE",
+            "WATCH_SEND_AT",
+            *self._INT_SETTINGS,
+            *self._FLOAT_SETTINGS,
+            *self._BOOL_SETTINGS,
         ]
         for key in keys:
             value = os.getenv(key)
@@ -106,18 +242,51 @@ class Config:
             self.events_dir = self._resolve_path(value)
         elif key == "RECIPIENT_LIST":
             self.recipient_list_file = self._resolve_path(value)
+        elif key == "CACHE_DIR":
+            self.cache_dir = self._resolve_path(value)
+        elif key == "EVENT_STORE":
+            if value.lower() in {"json", "sqlite"}:
+                self.event_store = value.lower()
+        elif key == "OA_ENGINE":
+            if value.lower() in {"thread", "async"}:
+                self.oa_engine = value.lower()
         elif key == "SMTP_SERVER":
             if value:
                 self.smtp_server = value
-        elif key == "SMTP_PORT":
+        elif key in self._INT_SETTINGS:
+            attr, minimum = self._INT_SETTINGS[key]
+            try:
+                parsed = int(value)
+            except ValueError:
+                return
+            if parsed >= minimum:
+                setattr(self, attr, parsed)
+        elif key in self._BOOL_SETTINGS:
+            setattr(self, self._BOOL_SETTINGS[key], value.lower() not in {"0", "false", "no", "off"})
+        elif key in self._FLOAT_SETTINGS:
             try:
-                self.smtp_port = int(value)
+                parsed_float = float(value)
             except ValueError:
-                pass
+                return
+            if parsed_float >= 0:
+                setattr(self, self._FLOAT_SETTINGS[key], parsed_float)
         elif key == "SMTP_USER":
             self.smtp_user = value or None
         elif key == "SMTP_PASSWORD":
             self.smtp_password = value or None
+        elif key == "OA_BASE_URL":
+            self.oa_base_url = value or None
+        elif key == "AI_URL":
+            self.ai_url = value or None
+        elif key == "WATCH_SEND_AT":
+            if not value or value.lower() in {"0", "off", "none"}:
+                self.watch_send_at = ""
+            else:
+                hour, _, minute = value.partition(":")
+                if hour.isdigit() and minute.isdigit() and int(hour) < 24 and int(minute) < 60:
+                    self.watch_send_at = f"{int(hour):02d}:{int(minute):02d}"
+        elif key == "METRICS_TEXTFILE":
+            self.metrics_textfile = self._resolve_path(value) if value else None
         elif key == "API_KEY":
             token = value.replace("Bearer ", "", 1)
             self.api_key = token or None
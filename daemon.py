@@ -0,0 +1,206 @@
+"""Resident watch mode: poll the OA listing and send digests without cron.
+
+The daemon keeps one spider (HTTP sessions, caches, indexes) and one sender
+alive between polls. Each poll fetches the first listing page and compares a
+hash of its rows with the previous poll; only when it changed does the
+incremental crawl of today run. Digests go out once a day at
+``WATCH_SEND_AT`` for the previous day, and, with ``WATCH_SEND_THRESHOLD``
+set, as soon as that many unsent notices of today have accumulated. Links
+already mailed are remembered in ``cache/watch_state.json`` so neither path
+sends a notice twice, also across restarts. Links are only recorded once
+every recipient was reached; partial failures are retried on the next poll
+and the sender's outbox keeps recipients who already got that digest from
+receiving it again.
+
+``Config`` is rebuilt only when the ``env`` file's modification time changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from common.metrics import METRICS, export_run
+from config.config import Config
+from sender.Sender import Sender
+from spider.OAP import OA
+
+# 发送记录保留天数
+_STATE_DAYS = 7
+
+
+class WatchDaemon:
+    """Poll, crawl on change and send on schedule or threshold until stopped."""
+
+    def __init__(self, spider_class: Callable[[Config], type[OA]] = lambda config: OA) -> None:
+        self.spider_class = spider_class
+        self._stop = threading.Event()
+        self._listing_hash: str | None = None
+        self._env_mtime: float | None = None
+        self.config: Config | None = None
+        self.spider: OA | None = None
+        self.sender: Sender | None = None
+
+    def run(self) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+        self._load_config()
+        print(
+            f"守护模式启动：每 {self.config.watch_interval}s 检查一次列表，"
+            f"定时发送 {self.config.watch_send_at or '关闭'}，"
+            f"阈值发送 {self.config.watch_send_threshold or '关闭'}"
+        )
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as exc:  # 单次轮询失败不退出守护进程
+                    print(f"本轮检查出错: {exc}")
+                self._stop.wait(self.config.watch_interval)
+        finally:
+            self._close()
+            print("守护模式已退出")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> None:
+        if self._env_changed():
+            print("检测到 env 文件变化，重新加载配置")
+            self._close()
+            self._load_config()
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        METRICS.reset()
+        worked = False
+        if self._listing_changed():
+            self._crawl(today)
+            worked = True
+        # 阈值发送每轮都检查，上次投递失败的通知在下一轮重试
+        if self.config.watch_send_threshold:
+            worked |= self._send_if_threshold(today)
+        worked |= self._send_if_scheduled(today)
+        if worked:
+            export_run(self.config, "watch")
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+    def _listing_changed(self) -> bool:
+        spider = self.spider
+        page = spider._post(spider.listing_url, {**spider.payload, "pageindex": "1"})
+        if not page:
+            print("获取OA列表失败，等待下次检查")
+            return False
+        rows = spider._parse_rows(page, spider.oa_host)
+        digest = hashlib.sha256(json.dumps(rows, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+        changed = digest != self._listing_hash
+        self._listing_hash = digest
+        METRICS.inc("watch_polls_total", changed=str(changed).lower())
+        return changed
+
+    def _env_changed(self) -> bool:
+        return self._env_mtime_now() != self._env_mtime
+
+    def _env_mtime_now(self) -> float | None:
+        try:
+            return self.config.env_file.stat().st_mtime
+        except OSError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Crawling and sending
+    # ------------------------------------------------------------------
+    def _crawl(self, date: str) -> None:
+        # 复用同一个爬虫实例，连接池与缓存保持常驻
+        self.spider.target_date = date
+        self.spider.run()
+
+    def _send_if_threshold(self, today: str) -> bool:
+        unsent = self._unsent(today)
+        if len(unsent) < self.config.watch_send_threshold:
+            return False
+        print(f"{today} 未发送的新通知达到 {len(unsent)} 条，立即发送")
+        self._send(today, unsent)
+        return True
+
+    def _send_if_scheduled(self, today: str) -> bool:
+        send_at = self.config.watch_send_at
+        state = self._load_state()
+        if not send_at or datetime.now().strftime("%H:%M") < send_at or state.get("digest_day") == today:
+            return False
+
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        # 发送前补抓一次昨天，确保当天稍晚发布的通知也包含在内
+        self._crawl(yesterday)
+        unsent = self._unsent(yesterday)
+        if not unsent:
+            print(f"{yesterday} 没有未发送的通知")
+        elif not self._send(yesterday, unsent):
+            # 不记录 digest_day，下一轮再次尝试
+            return True
+        state = self._load_state()
+        state["digest_day"] = today
+        self._save_state(state)
+        return True
+
+    def _unsent(self, date: str) -> list[dict[str, str]]:
+        sent = set(self._load_state().get("sent", {}).get(date, []))
+        return [event for event in self.spider.store.load_day(date) or [] if event["链接"] not in sent]
+
+    def _send(self, date: str, events: list[dict[str, str]]) -> bool:
+        """Deliver and record the links as sent; False when some recipient was not reached."""
+        results = self.sender.deliver(date, events)
+        if results is None or any(error is not None for error in results.values()):
+            # 未能投递给所有收件人时不记为已发送，下次重试；已送达的收件人由投递记录跳过
+            print(f"{date} 的摘要未全部送达，稍后重试")
+            return False
+        state = self._load_state()
+        sent = state.setdefault("sent", {})
+        sent[date] = sorted(set(sent.get(date, [])) | {event["链接"] for event in events})
+        oldest = (datetime.now() - timedelta(days=_STATE_DAYS)).strftime("%Y-%m-%d")
+        state["sent"] = {day: links for day, links in sent.items() if day >= oldest}
+        self._save_state(state)
+        return True
+
+    # ------------------------------------------------------------------
+    # Lifecycle and state
+    # ------------------------------------------------------------------
+    def _load_config(self) -> None:
+        self.config = Config()
+        self._env_mtime = self._env_mtime_now()
+        self.spider = self.spider_class(self.config)(config=self.config)
+        self.sender = Sender(config=self.config)
+        self._listing_hash = None
+
+    def _close(self) -> None:
+        if self.spider is not None:
+            self.spider.close()
+            self.spider = None
+        if self.sender is not None:
+            self.sender.close()
+            self.sender = None
+
+    @property
+    def _state_path(self) -> Path:
+        return self.config.cache_dir / "watch_state.json"
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self._state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: dict) -> None:
+        tmp = self._state_path.with_name(f".{self._state_path.name}.tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self._state_path)
+
+
+__all__ = ["WatchDaemon"]
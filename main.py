@@ -11,8 +11,11 @@ project_root = Path(__file__).resolve().parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from common.metrics import METRICS, export_run, profiled  # noqa: E402
+from config.config import Config  # noqa: E402
 from spider.OAP import OA  # noqa: E402
 from sender.Sender import Sender  # noqa: E402
+from pipeline import run_pipeline  # noqa: E402
 
 
 def _normalize_target_date(raw: str | None) -> str:
@@ -28,28 +31,91 @@ def _normalize_target_date(raw: str | None) -> str:
     return parsed.strftime("%Y-%m-%d")
 
 
-def main(target_date: str | None = None) -> None:
+def _spider_class(config: Config, engine: str | None) -> type[OA]:
+    """Pick the detail/summary engine; ``engine`` overrides ``OA_ENGINE``."""
+    if (engine or config.oa_engine) != "async":
+        return OA
+    try:
+        from spider.async_engine import AsyncOA, aiohttp
+    except ImportError as exc:  # pragma: no cover - defensive
+        print(f"无法加载异步引擎: {exc}，改用线程引擎")
+        return OA
+    if aiohttp is None:
+        print("未安装 aiohttp，改用线程引擎")
+        return OA
+    return AsyncOA
+
+
+def main(target_date: str | None = None, pipeline: bool = False, engine: str | None = None) -> None:
     date_str = _normalize_target_date(target_date)
     print(f"计划处理 {date_str} 的OA通知")
 
-    spider = OA(target_date=date_str)
-    spider.run()
+    config = Config()
+    METRICS.reset()
+    try:
+        with profiled(config, "run"):
+            _run_day(date_str, config, pipeline, engine)
+    finally:
+        export_run(config, "run")
 
-    events_file = spider.events_dir / f"{date_str}.json"
-    if not events_file.exists():
-        print(f"未生成 {events_file}，跳过发送邮件")
+
+def _run_day(date_str: str, config: Config, pipeline: bool, engine: str | None) -> None:
+    if pipeline:
+        run_pipeline(date_str, config=config)
         return
 
-    sender = Sender(target_date=date_str)
+    spider = _spider_class(config, engine)(target_date=date_str, config=config)
+    try:
+        spider.run()
+        generated = spider.store.has_day(date_str)
+    finally:
+        spider.close()
+
+    if not generated:
+        print(f"未生成 {date_str} 的事件数据，跳过发送邮件")
+        return
+
+    sender = Sender(target_date=date_str, config=config)
     sender.run()
 
 
+def backfill(date_from: str, date_to: str | None = None, engine: str | None = None) -> None:
+    """Rebuild ``events/*.json`` for a date range with a single listing crawl."""
+    start = _normalize_target_date(date_from)
+    end = _normalize_target_date(date_to)
+    print(f"计划回填 {start} 至 {end} 的OA通知（回填模式不发送邮件）")
+
+    config = Config()
+    METRICS.reset()
+    spider = _spider_class(config, engine)(target_date=end, config=config)
+    try:
+        with profiled(config, "backfill"):
+            spider.run_range(start, end)
+    finally:
+        spider.close()
+        export_run(config, "backfill")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="抓取OA通知并发送邮件")
     parser.add_argument("--date", help="指定目标日期，默认使用昨天 (YYYY-MM-DD)")
+    parser.add_argument("--from", dest="date_from", help="回填起始日期 (YYYY-MM-DD)，仅生成事件文件")
+    parser.add_argument("--to", dest="date_to", help="回填结束日期 (YYYY-MM-DD)，默认昨天")
+    parser.add_argument("--pipeline", action="store_true", help="抓取、摘要与邮件渲染在内存中流水线并行执行")
+    parser.add_argument("--watch", action="store_true", help="常驻守护模式：定期检查列表，有变化时抓取并按计划或阈值发送")
+    parser.add_argument(
+        "--engine", choices=["thread", "async"], help="详情与摘要引擎，默认读取 OA_ENGINE（thread）；--pipeline 时不生效"
+    )
     args = parser.parse_args()
 
     try:
-        main(target_date=args.date)
+        if args.watch:
+            from daemon import WatchDaemon
+
+            WatchDaemon(lambda config: _spider_class(config, args.engine)).run()
+        elif args.date_from:
+            backfill(args.date_from, args.date_to, engine=args.engine)
+        else:
+            main(target_date=args.date, pipeline=args.pipeline, engine=args.engine)
     except ValueError as exc:
         print(exc)
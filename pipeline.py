@@ -0,0 +1,125 @@
+"""In-process streaming pipeline: listing -> details -> summaries -> digest.
+
+Stages run concurrently and hand events to each other through bounded
+queues, so fetching the next notice overlaps with summarizing the current
+one. The day's JSON file is still written, but the digest is rendered from
+the events already in memory instead of being read back from disk.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable
+
+from config.config import Config
+from sender.Sender import Sender
+from spider.OAP import OA
+
+_DONE = object()
+
+
+def _run_workers(count: int, target: Callable[[], None], downstream: queue.Queue, sentinels: int) -> None:
+    """Start ``count`` workers and send ``sentinels`` end markers downstream once all exit."""
+    workers = [threading.Thread(target=target, daemon=True) for _ in range(count)]
+    for worker in workers:
+        worker.start()
+
+    def close() -> None:
+        for worker in workers:
+            worker.join()
+        for _ in range(sentinels):
+            downstream.put(_DONE)
+
+    threading.Thread(target=close, daemon=True).start()
+
+
+def run_pipeline(target_date: str, config: Config | None = None, send: bool = True) -> list[dict[str, str]]:
+    config = config or Config()
+    spider = OA(target_date=target_date, config=config)
+    sender = Sender(target_date=target_date, config=config)
+    fetch_workers = config.oa_concurrency
+    summary_workers = config.ai_concurrency
+    depth = max(fetch_workers, summary_workers) * 2
+
+    fetch_q: queue.Queue = queue.Queue(maxsize=depth)
+    summary_q: queue.Queue = queue.Queue(maxsize=depth)
+    render_q: queue.Queue = queue.Queue(maxsize=depth)
+    # 与 OA.run 一致：OA_RUN_DEADLINE 从这里开始计时
+    spider.retry.start_run()
+    started = time.perf_counter()
+
+    def list_stage() -> None:
+        position = 0
+        try:
+            for row in spider._iter_listing(spider.target_date):
+                if row["发布日期"] != spider.target_date:
+                    continue
+                position += 1
+                seen = spider.seen_index.is_current(row) if spider.incremental else None
+                if seen is not None:
+                    row["摘要"] = seen["summary"]
+                    render_q.put((position, row))
+                else:
+                    fetch_q.put((position, row))
+        finally:
+            print(f"列表解析完成，共 {position} 条事件")
+
+    def fetch_stage() -> None:
+        while (item := fetch_q.get()) is not _DONE:
+            position, event = item
+            try:
+                article = spider._fetch_article(position, 0, event)
+            except Exception as exc:  # 单条失败不能阻塞整条流水线
+                print(f"[{position}] 处理详情时出错: {exc}")
+                event["摘要"] = "[获取摘要失败]"
+                article = None
+            summary_q.put((position, event, article))
+
+    def summary_stage() -> None:
+        while (item := summary_q.get()) is not _DONE:
+            position, event, article = item
+            try:
+                if article is not None:
+                    spider._summarize_fetched(position, 0, event, article)
+            except Exception as exc:
+                print(f"[{position}] 生成摘要时出错: {exc}")
+                event["摘要"] = "[摘要生成失败]"
+            render_q.put((position, event))
+
+    _run_workers(1, list_stage, fetch_q, fetch_workers)
+    _run_workers(fetch_workers, fetch_stage, summary_q, summary_workers)
+    _run_workers(summary_workers, summary_stage, render_q, 1)
+
+    # 渲染阶段在主线程：事件一到就生成卡片，最后按列表顺序拼接
+    cards: dict[str, str] = {}
+    ordered: dict[int, dict[str, str]] = {}
+    try:
+        while (item := render_q.get()) is not _DONE:
+            position, event = item
+            ordered[position] = event
+            cards[event["链接"]] = sender._render_card(event)
+
+        spider.events = spider._collapse_duplicates([ordered[position] for position in sorted(ordered)])
+        for link in spider.merged_links:
+            cards.pop(link, None)
+        if not spider.events:
+            print(f"{target_date} 没有需要记录的通知")
+            return []
+
+        spider._save_events()
+        events = spider.store.load_day(target_date) or spider.events
+        elapsed = time.perf_counter() - started
+        print(f"流水线处理 {len(spider.events)} 条事件用时 {elapsed:.1f}s，{spider.summary_cache.stats()}")
+        spider._report_ai_timings()
+
+        if send:
+            sender.deliver(target_date, events, cards)
+        return events
+    finally:
+        spider.close()
+        sender.close()
+
+
+__all__ = ["run_pipeline"]
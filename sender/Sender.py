@@ -1,7 +1,5 @@
 import argparse
 import datetime
-import json
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
@@ -12,23 +10,44 @@ project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from common.metrics import METRICS, export_run
 from config.config import Config
+from sender.connection import SMTPConnection
+from sender.delivery import DeliveryEngine
+from sender.outbox import Outbox
+from sender.subscriptions import Subscription, group_by_selection, load_subscriptions
+from storage.events import EventStore, open_store
 
 
 class Sender:
     """Send the most recent OA announcement digest to configured recipients."""
 
-    def __init__(self, target_date: str | None = None) -> None:
-        self.config = Config()
+    def __init__(self, target_date: str | None = None, config: Config | None = None) -> None:
+        self.config = config or Config()
         self.config.ensure_directories()
         self.events_dir = self.config.events_dir
+        self.store: EventStore = open_store(self.config)
+        # 持久化的投递记录，重跑时跳过已成功发送的收件人
+        self.outbox = (
+            Outbox(self.config.cache_dir / "outbox.sqlite3", self.config.outbox_max_attempts)
+            if self.config.outbox
+            else None
+        )
         self.target_date = target_date
 
     def run(self) -> None:
         print("开始处理OA通知并发送邮件...")
-        self._process_new_files()
+        try:
+            self._process_new_files()
+        finally:
+            self.close()
         print("处理完成")
 
+    def close(self) -> None:
+        self.store.close()
+        if self.outbox:
+            self.outbox.close()
+
     def _get_smtp_credentials(self) -> tuple[str | None, str | None]:
         smtp_user = self.config.smtp_user
         smtp_password = self.config.smtp_password
@@ -38,7 +57,17 @@ class Sender:
         return smtp_user, smtp_password
 
     @staticmethod
-    def _generate_html(data, date: str) -> str:
+    def _render_card(item: dict[str, str]) -> str:
+        return f"""
+            <div class="notification">
+                <div class="title"><a href="{item['链接']}">{item['标题']}</a></div>
+                <div class="unit">{item['发布单位']}</div>
+                <div class="summary">{item['摘要']}</div>
+            </div>
+            """
+
+    @staticmethod
+    def _assemble_html(cards: list[str], date: str) -> str:
         html_content = f"""
         <html>
         <head>
@@ -121,14 +150,7 @@ class Sender:
             <h1>{date} 通知汇总</h1>
             <div class="notification-container">
         """
-        for item in data:
-            html_content += f"""
-            <div class="notification">
-                <div class="title"><a href="{item['链接']}">{item['标题']}</a></div>
-                <div class="unit">{item['发布单位']}</div>
-                <div class="summary">{item['摘要']}</div>
-            </div>
-            """
+        html_content += "".join(cards)
         html_content += """
             </div>
         </body>
@@ -136,118 +158,199 @@ class Sender:
         """
         return html_content
 
-    def _send_email(self, file_path: Path, recipient_email: str, smtp_user: str, smtp_password: str) -> bool:
-        try:
-            date = file_path.stem
-            with file_path.open('r', encoding='utf-8') as file:
-                data = json.load(file)
-
-            if not data:
-                print(f"文件 {file_path} 不包含数据，跳过为 {recipient_email} 发送邮件")
-                return False
-
-            html_content = self._generate_html(data, date)
-
-            msg = MIMEMultipart()
-            msg['From'] = smtp_user
-            msg['To'] = recipient_email
-            msg['Subject'] = f'{date} OA通知汇总'
-            msg.attach(MIMEText(html_content, 'html', 'utf-8'))
-
-            server = smtplib.SMTP_SSL(self.config.smtp_server, self.config.smtp_port)
-            server.login(smtp_user, smtp_password)
-            server.sendmail(smtp_user, recipient_email, msg.as_string())
-            server.quit()
-
-            print(f"成功发送 {date} 的邮件通知给 {recipient_email}")
-            return True
-        except Exception as e:
-            print(f"为 {recipient_email} 发送邮件失败 ({file_path}): {e}")
-            return False
-
-    def _get_email_list(self) -> list[str]:
+    @staticmethod
+    def _build_message(html_content: str, date: str, sender: str, to_header: str) -> str:
+        msg = MIMEMultipart()
+        msg['From'] = sender
+        msg['To'] = to_header
+        msg['Subject'] = f'{date} OA通知汇总'
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg.as_string()
+
+    def _build_engine(self, smtp_user: str, smtp_password: str) -> DeliveryEngine:
+        def connection_factory() -> SMTPConnection:
+            return SMTPConnection(
+                self.config.smtp_server,
+                self.config.smtp_port,
+                smtp_user,
+                smtp_password,
+                max_messages=self.config.smtp_max_per_connection,
+                use_ssl=self.config.smtp_ssl,
+            )
+
+        return DeliveryEngine(
+            connection_factory,
+            workers=self.config.smtp_workers,
+            rate=self.config.smtp_rate,
+            connection_rate=self.config.smtp_connection_rate,
+            bcc_batch=self.config.smtp_bcc_batch,
+        )
+
+    def _get_subscriptions(self) -> list[Subscription]:
         try:
             recipient_file = self.config.recipient_list_file
             if not recipient_file.exists():
                 print(f"{recipient_file} 文件不存在，请创建该文件并添加邮箱地址（每行一个）")
                 return []
 
-            with recipient_file.open('r', encoding='utf-8') as f:
-                emails = [line.strip() for line in f if line.strip() and '@' in line]
-
-            if not emails:
+            subscriptions = load_subscriptions(recipient_file)
+            if not subscriptions:
                 print(f"{recipient_file} 文件中没有找到有效的邮箱地址")
                 return []
 
-            print(f"从 {recipient_file} 中读取到{len(emails)}个邮箱地址")
-            return emails
+            filtered = sum(1 for subscription in subscriptions if not subscription.wants_everything)
+            print(f"从 {recipient_file} 中读取到{len(subscriptions)}个邮箱地址，其中{filtered}个设置了订阅规则")
+            return subscriptions
         except Exception as e:
             print(f"读取邮箱列表时出错: {e}")
             return []
 
-    def _locate_target_file(self) -> Path | None:
-        if not self.events_dir.exists():
-            print(f"目录 {self.events_dir} 不存在，请确保该目录已创建")
-            return None
-
-        json_files = sorted(self.events_dir.glob('*.json'))
-        if not json_files:
-            print(f"在 {self.events_dir} 目录中没有找到JSON文件")
-            return None
-
+    def _locate_target_date(self) -> str | None:
         if self.target_date:
             try:
-                target = datetime.datetime.strptime(self.target_date, '%Y-%m-%d')
+                target = datetime.datetime.strptime(self.target_date, '%Y-%m-%d').strftime('%Y-%m-%d')
             except ValueError:
                 print(f"指定的日期格式无效: {self.target_date}，请使用 YYYY-MM-DD")
                 return None
 
-            target_file = self.events_dir / f"{target.strftime('%Y-%m-%d')}.json"
-            if target_file.exists():
-                print(f"使用指定日期的JSON文件: {target_file}")
-                return target_file
+            if self.store.has_day(target):
+                print(f"使用指定日期的事件数据: {target}")
+                return target
 
-            print(f"未找到指定日期 {target.strftime('%Y-%m-%d')} 的文件")
+            print(f"未找到指定日期 {target} 的文件")
             return None
 
-        yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-        yesterday_file = self.events_dir / f"{yesterday.strftime('%Y-%m-%d')}.json"
-        if yesterday_file.exists():
-            print(f"找到前一天的JSON文件: {yesterday_file}")
-            return yesterday_file
+        yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+        if self.store.has_day(yesterday):
+            print(f"找到前一天的事件数据: {yesterday}")
+            return yesterday
 
-        json_files.sort(key=lambda path: path.stat().st_mtime, reverse=True)
-        latest_file = json_files[0]
-        print(f"未找到前一天文件，使用最新的JSON文件: {latest_file}")
-        return latest_file
+        latest = self.store.latest_day()
+        if latest is None:
+            print(f"在 {self.events_dir} 中没有找到任何事件数据")
+            return None
+        print(f"未找到前一天数据，使用最近写入的事件数据: {latest}")
+        return latest
 
     def _process_new_files(self) -> None:
         try:
-            target_file = self._locate_target_file()
-            if not target_file:
-                return
-
-            email_list = self._get_email_list()
-            if not email_list:
+            date = self._locate_target_date()
+            if not date:
                 return
 
-            smtp_user, smtp_password = self._get_smtp_credentials()
-            if not smtp_user or not smtp_password:
+            data = self.store.load_day(date)
+            if not data:
+                print(f"{date} 的事件数据为空，跳过发送邮件")
                 return
 
-            success_count = 0
-            for email in email_list:
-                if self._send_email(target_file, email, smtp_user, smtp_password):
-                    success_count += 1
-
-            print(f"邮件发送完成，成功: {success_count}/{len(email_list)}")
+            self.deliver(date, data)
         except Exception as e:
             print(f"处理文件时出错: {e}")
 
+    def deliver(
+        self, date: str, events: list[dict[str, str]], cards: dict[str, str] | None = None
+    ) -> dict[str, str | None] | None:
+        """Send each recipient the digest of the ``events`` matching their subscription.
+
+        ``cards`` maps event links to already rendered cards (the pipeline
+        renders them while events stream in); missing cards are rendered here.
+        Returns ``{recipient: error or None}`` for the sends attempted (empty
+        when nobody needed a mail), or None when delivery could not start
+        because there are no recipients or no SMTP credentials.
+        """
+        subscriptions = self._get_subscriptions()
+        if not subscriptions:
+            return None
+
+        smtp_user, smtp_password = self._get_smtp_credentials()
+        if not smtp_user or not smtp_password:
+            return None
+
+        groups, skipped = self._render_digests(date, events, cards or {}, subscriptions)
+        if skipped:
+            print(f"{len(skipped)}个收件人没有匹配的通知，跳过发送: {', '.join(skipped)}")
+        groups = self._claim_outbox(date, groups)
+        if not groups:
+            return {}
+
+        def record(group: int, batch: list[str], error: str | None) -> None:
+            # 按分组取摘要标识：同一地址可能因多条订阅规则出现在不同分组中
+            if self.outbox:
+                self.outbox.record(date, groups[group][2], batch, error)
+
+        engine = self._build_engine(smtp_user, smtp_password)
+        results = engine.deliver_groups(
+            [
+                (recipients, lambda batch, to_header, html=html: self._build_message(html, date, smtp_user, to_header))
+                for recipients, html, _ in groups
+            ],
+            on_result=record,
+        )
+
+        failed = [email for email, error in results.items() if error is not None]
+        print(f"邮件发送完成，成功: {len(results) - len(failed)}/{len(results)}")
+        if failed:
+            print(f"发送失败的地址: {', '.join(failed)}")
+        return results
+
+    def _render_digests(
+        self,
+        date: str,
+        events: list[dict[str, str]],
+        cards: dict[str, str],
+        subscriptions: list[Subscription],
+    ) -> tuple[list[tuple[list[str], str, str]], list[str]]:
+        """Render every card once, then assemble one digest per distinct subscription.
+
+        Returns ``([(recipients, html, digest id)], skipped recipients)``; the
+        digest id identifies the set of notices for the outbox.
+        """
+        with METRICS.timed("render_digest"):
+            fragments = [cards.get(event["链接"]) or self._render_card(event) for event in events]
+            groups: list[tuple[list[str], str, str]] = []
+            skipped: list[str] = []
+            for members in group_by_selection(subscriptions).values():
+                rule = members[0]
+                recipients = [member.email for member in members]
+                selected = [(event, fragment) for event, fragment in zip(events, fragments) if rule.matches(event)]
+                if selected:
+                    html = self._assemble_html([fragment for _, fragment in selected], date)
+                    groups.append((recipients, html, Outbox.digest_id([event["链接"] for event, _ in selected])))
+                else:
+                    skipped.extend(recipients)
+        if len(groups) > 1:
+            print(f"按订阅规则生成了{len(groups)}份不同的摘要")
+        return groups, skipped
+
+    def _claim_outbox(
+        self, date: str, groups: list[tuple[list[str], str, str]]
+    ) -> list[tuple[list[str], str, str]]:
+        """Drop recipients the outbox already delivered to (or gave up on)."""
+        if not self.outbox:
+            return groups
+
+        remaining: list[tuple[list[str], str, str]] = []
+        already_sent = 0
+        for recipients, html, digest in groups:
+            to_send, sent, given_up = self.outbox.claim(date, digest, recipients)
+            already_sent += len(sent)
+            if given_up:
+                print(f"{len(given_up)}个收件人已连续失败{self.outbox.max_attempts}次，不再重试: {', '.join(given_up)}")
+            if to_send:
+                remaining.append((to_send, html, digest))
+        if already_sent:
+            print(f"{already_sent}个收件人已收到 {date} 的同一份摘要，跳过")
+            METRICS.inc("outbox_skipped_total", already_sent)
+        return remaining
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='发送OA通知邮件')
     parser.add_argument('--date', help='指定要发送的通知日期，格式 YYYY-MM-DD')
     args = parser.parse_args()
 
-    Sender(target_date=args.date).run()
+    sender = Sender(target_date=args.date)
+    try:
+        sender.run()
+    finally:
+        export_run(sender.config, "sender")
@@ -0,0 +1,80 @@
+"""Reusable authenticated SMTP session for digest delivery."""
+
+from __future__ import annotations
+
+import smtplib
+
+from common.metrics import METRICS
+
+
+class SMTPConnection:
+    """Keep one logged-in SMTP session open across many messages.
+
+    The session is opened lazily, recycled after ``max_messages`` messages and
+    re-established transparently when the server drops the connection.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        port: int,
+        user: str,
+        password: str,
+        max_messages: int = 50,
+        use_ssl: bool = True,
+    ) -> None:
+        self.server = server
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_messages = max_messages
+        self.use_ssl = use_ssl
+        self._smtp: smtplib.SMTP | None = None
+        self._sent_on_connection = 0
+
+    def send(self, to_addrs: list[str], message: str) -> None:
+        if self._smtp is not None and self._sent_on_connection >= self.max_messages:
+            self.close()
+
+        with METRICS.timed("smtp_send"):
+            try:
+                self._ensure_connected().sendmail(self.user, to_addrs, message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # 服务器主动断开（空闲超时或限流），重连后重试一次
+                self._drop()
+                METRICS.inc("smtp_reconnects_total")
+                self._ensure_connected().sendmail(self.user, to_addrs, message)
+        self._sent_on_connection += 1
+        METRICS.inc("smtp_messages_total")
+        METRICS.inc("smtp_recipients_total", len(to_addrs))
+        METRICS.inc("smtp_bytes_total", len(message.encode("utf-8")))
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._drop()
+
+    def _ensure_connected(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+            smtp = smtp_class(self.server, self.port)
+            smtp.login(self.user, self.password)
+            self._smtp = smtp
+            self._sent_on_connection = 0
+        return self._smtp
+
+    def _drop(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except OSError:
+                pass
+        self._smtp = None
+        self._sent_on_connection = 0
+
+
+__all__ = ["SMTPConnection"]
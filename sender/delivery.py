@@ -0,0 +1,123 @@
+"""Parallel SMTP delivery with per-server and per-connection rate limits."""
+
+from __future__ import annotations
+
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+
+from common.ratelimit import TokenBucket
+from sender.connection import SMTPConnection
+
+
+class DeliveryEngine:
+    """Deliver digests to many recipients over a pool of SMTP connections.
+
+    ``build_message`` receives the recipients of one send and the value for the
+    ``To`` header, and returns the serialized message. With ``bcc_batch`` > 1
+    recipients are grouped into envelope-only (BCC) batches of that size;
+    batches never mix recipients of different groups.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], SMTPConnection],
+        workers: int = 1,
+        rate: float = 0.0,
+        connection_rate: float = 0.0,
+        bcc_batch: int = 1,
+    ) -> None:
+        self.connection_factory = connection_factory
+        self.workers = workers
+        self.bcc_batch = bcc_batch
+        self._server_bucket = TokenBucket(rate)
+        self._connection_rate = connection_rate
+
+    def deliver(
+        self,
+        recipients: list[str],
+        build_message: Callable[[list[str], str], str],
+    ) -> dict[str, str | None]:
+        """Send to every recipient; returns ``{recipient: error or None}``."""
+        return self.deliver_groups([(recipients, build_message)])
+
+    def deliver_groups(
+        self,
+        groups: list[tuple[list[str], Callable[[list[str], str], str]]],
+        on_result: Callable[[int, list[str], str | None], None] | None = None,
+    ) -> dict[str, str | None]:
+        """Send a different message to each recipient group over one shared connection pool.
+
+        ``on_result(group, batch, error)`` is called from the worker thread as
+        soon as each send finishes (``group`` is the index into ``groups``), so
+        outcomes can be persisted before the next one. A recipient listed in
+        several groups reports the first error among them.
+        """
+        batches = [
+            (group, batch, build_message)
+            for group, (recipients, build_message) in enumerate(groups)
+            for batch in self._batches(recipients)
+        ]
+        results: dict[str, str | None] = {}
+        if not batches:
+            return results
+
+        workers = max(1, min(self.workers, len(batches)))
+        pool: queue.Queue[tuple[SMTPConnection, TokenBucket]] = queue.Queue()
+        for _ in range(workers):
+            pool.put((self.connection_factory(), TokenBucket(self._connection_rate)))
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._send_batch, pool, batch, build_message, on_result and partial(on_result, group))
+                    for group, batch, build_message in batches
+                ]
+                for (_, batch, _), future in zip(batches, futures):
+                    error = future.result()
+                    for recipient in batch:
+                        results[recipient] = results.get(recipient) or error
+        finally:
+            while not pool.empty():
+                connection, _ = pool.get_nowait()
+                connection.close()
+
+        elapsed = time.perf_counter() - started
+        succeeded = sum(1 for error in results.values() if error is None)
+        print(f"投递完成，成功: {succeeded}/{len(results)}，连接数 {workers}，总耗时 {elapsed:.2f}s")
+        return results
+
+    def _batches(self, recipients: list[str]) -> list[list[str]]:
+        size = max(1, self.bcc_batch)
+        return [recipients[i:i + size] for i in range(0, len(recipients), size)]
+
+    def _send_batch(
+        self,
+        pool: queue.Queue[tuple[SMTPConnection, TokenBucket]],
+        batch: list[str],
+        build_message: Callable[[list[str], str], str],
+        on_result: Callable[[list[str], str | None], None] | None = None,
+    ) -> str | None:
+        connection, connection_bucket = pool.get()
+        error: str | None = None
+        try:
+            to_header = batch[0] if len(batch) == 1 else connection.user
+            message = build_message(batch, to_header)
+            self._server_bucket.acquire()
+            connection_bucket.acquire()
+            connection.send(batch, message)
+            print(f"成功发送邮件给 {', '.join(batch)}")
+        except Exception as exc:
+            print(f"为 {', '.join(batch)} 发送邮件失败: {exc}")
+            error = str(exc)
+        finally:
+            pool.put((connection, connection_bucket))
+        if on_result is not None:
+            on_result(batch, error)
+        return error
+
+
+__all__ = ["DeliveryEngine"]
@@ -0,0 +1,105 @@
+"""Durable per-recipient delivery log so reruns do not mail anyone twice."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 投递记录保留天数
+_RETENTION_DAYS = 30
+
+
+class Outbox:
+    """SQLite record of every (date, digest, recipient) delivery.
+
+    A digest is identified by the links it contains, so rerunning the same
+    day skips recipients already marked ``sent`` while a digest with new
+    notices is a new delivery. Failed sends keep their attempt count and
+    last error; after ``max_attempts`` failures a recipient is given up on.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_SENT = "sent"
+    STATE_FAILED = "failed"
+
+    def __init__(self, db_path: Path, max_attempts: int) -> None:
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS deliveries (
+                date TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                email TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (date, digest, email)
+            )
+            """
+        )
+        self._conn.commit()
+        self.prune()
+
+    @staticmethod
+    def digest_id(links: list[str]) -> str:
+        return hashlib.sha256("\0".join(sorted(links)).encode("utf-8")).hexdigest()[:16]
+
+    def claim(self, date: str, digest: str, recipients: list[str]) -> tuple[list[str], list[str], list[str]]:
+        """Enqueue ``recipients`` and split them into ``(to_send, already_sent, given_up)``."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO deliveries (date, digest, email, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(date, digest, email, self.STATE_PENDING, now) for email in recipients],
+            )
+            self._conn.commit()
+            rows = {
+                email: (state, attempts)
+                for email, state, attempts in self._conn.execute(
+                    "SELECT email, state, attempts FROM deliveries WHERE date = ? AND digest = ?", (date, digest)
+                )
+            }
+        to_send: list[str] = []
+        sent: list[str] = []
+        given_up: list[str] = []
+        for email in recipients:
+            state, attempts = rows[email]
+            if state == self.STATE_SENT:
+                sent.append(email)
+            elif attempts >= self.max_attempts:
+                given_up.append(email)
+            else:
+                to_send.append(email)
+        return to_send, sent, given_up
+
+    def record(self, date: str, digest: str, recipients: list[str], error: str | None) -> None:
+        """Store the outcome of one send right away, before the next batch goes out."""
+        state = self.STATE_SENT if error is None else self.STATE_FAILED
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE deliveries SET state = ?, attempts = attempts + 1, last_error = ?, updated_at = ? "
+                "WHERE date = ? AND digest = ? AND email = ?",
+                [(state, error, time.time(), date, digest, email) for email in recipients],
+            )
+            self._conn.commit()
+
+    def prune(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM deliveries WHERE updated_at < ?", (time.time() - _RETENTION_DAYS * 86400,)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["Outbox"]
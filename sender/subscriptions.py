@@ -0,0 +1,108 @@
+"""Per-recipient subscription rules read from ``List.txt``.
+
+Each non-empty line holds one address, optionally followed by ``|``-separated
+rules::
+
+    alice@stu.edu.cn
+    bob@stu.edu.cn | 单位=教务处,学生处 | 关键词=奖学金,讲座
+
+A line without rules receives every notice. Otherwise a notice is included
+when its ``发布单位`` contains one of the units or its ``标题`` contains one
+of the keywords. Lines for the same address are merged, so every recipient
+gets a single digest.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+_UNIT_KEYS = {"单位", "unit", "units"}
+_KEYWORD_KEYS = {"关键词", "keyword", "keywords"}
+
+
+@dataclass(frozen=True)
+class Subscription:
+    email: str
+    units: tuple[str, ...] = ()
+    keywords: tuple[str, ...] = ()
+
+    @property
+    def selection(self) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """Recipients with the same selection receive the same digest."""
+        return self.units, self.keywords
+
+    @property
+    def wants_everything(self) -> bool:
+        return not self.units and not self.keywords
+
+    def matches(self, event: dict[str, str]) -> bool:
+        if self.wants_everything:
+            return True
+        unit = event.get("发布单位", "")
+        title = event.get("标题", "")
+        return any(name in unit for name in self.units) or any(word in title for word in self.keywords)
+
+
+def parse_line(line: str) -> Subscription | None:
+    """Parse one ``List.txt`` line; returns None for blanks, comments and lines without an address."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    email, *rules = (part.strip() for part in line.split("|"))
+    if "@" not in email:
+        return None
+
+    units: set[str] = set()
+    keywords: set[str] = set()
+    for rule in rules:
+        key, _, values = rule.partition("=")
+        key = key.strip().lower()
+        items = {item.strip() for item in values.replace("，", ",").split(",") if item.strip()}
+        if key in _UNIT_KEYS:
+            units |= items
+        elif key in _KEYWORD_KEYS:
+            keywords |= items
+        else:
+            print(f"忽略无法识别的订阅规则: {rule}（{email}）")
+    return Subscription(email, tuple(sorted(units)), tuple(sorted(keywords)))
+
+
+def load_subscriptions(path: Path) -> list[Subscription]:
+    with path.open("r", encoding="utf-8") as handle:
+        return merge_subscriptions([subscription for line in handle if (subscription := parse_line(line))])
+
+
+def merge_subscriptions(subscriptions: list[Subscription]) -> list[Subscription]:
+    """Combine lines for the same address (case-insensitive) into one subscription.
+
+    Units and keywords are united; a line without rules makes the address
+    receive everything.
+    """
+    merged: dict[str, Subscription] = {}
+    for subscription in subscriptions:
+        key = subscription.email.lower()
+        previous = merged.get(key)
+        if previous is None:
+            merged[key] = subscription
+        elif previous.wants_everything or subscription.wants_everything:
+            merged[key] = Subscription(previous.email)
+        else:
+            merged[key] = Subscription(
+                previous.email,
+                tuple(sorted(set(previous.units) | set(subscription.units))),
+                tuple(sorted(set(previous.keywords) | set(subscription.keywords))),
+            )
+    return list(merged.values())
+
+
+def group_by_selection(subscriptions: list[Subscription]) -> dict[tuple, list[Subscription]]:
+    """Group recipients with identical rules so each distinct digest is assembled once."""
+    groups: dict[tuple, list[Subscription]] = {}
+    for subscription in subscriptions:
+        groups.setdefault(subscription.selection, []).append(subscription)
+    return groups
+
+
+__all__ = ["Subscription", "group_by_selection", "load_subscriptions", "merge_subscriptions", "parse_line"]
@@ -1,10 +1,15 @@
 import argparse
+import itertools
 import json
 import re
+import sqlite3
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import sys
+from typing import Iterator, Mapping
 
 # 添加项目根目录到Python路径
 project_root = Path(__file__).resolve().parent.parent
@@ -12,51 +17,370 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 import requests
-from bs4 import BeautifulSoup
-
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:  # lxml 为可选依赖，安装后自动用作更快的解析后端
+    import lxml  # noqa: F401
+except ImportError:
+    HTML_PARSER = "html.parser"
+else:
+    HTML_PARSER = "lxml"
+
+from common.metrics import METRICS, export_run
+from common.ratelimit import TokenBucket
+from common.retry import DeadlineExceeded, HTTPStatusError, RetryPolicy, parse_retry_after
 from config.config import Config
+from spider.article import extract_article
+from spider.cache import SummaryCache
+from spider.dedup import Deduplicator
+from spider.extractive import summarize_extractive
+from spider.httpcache import CachedPage, PageCache
+from spider.index import SeenIndex
+from spider.streaming import read_stream
+from storage.events import UNIT_SEPARATOR, EventStore, JsonDirStore, event_units, open_store
+
+_TBODY_PATTERN = re.compile(r"<tbody[\s>]", re.IGNORECASE)
+_DATALIGHT_PATTERN = re.compile(r"<tr[^>]*\bdatalight\b", re.IGNORECASE)
 
 
 class OA:
-    BASE_URL = "http://oa.stu.edu.cn/login/Login.jsp?logintype=1"
+    OA_HOST = "http://oa.stu.edu.cn"
+    LISTING_PATH = "/login/Login.jsp?logintype=1"
     AI_URL = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+    AI_MODEL = "glm-4.5-flash"
+    SYSTEM_PROMPT = """角色设定：
+你是一个专业的事件通知摘要生成器，擅长从各类通知公告中提取核心信息，并生成客观、中立的简短摘要。
+
+目标任务：
+请根据用户输入的通知事件消息（如公示、公告、通知等），提取关键要素，生成一段简洁的摘要。摘要需完全基于文本事实，不添加任何主观评价或额外信息。
+
+具体要求：
+1. **提取关键要素**：
+   - **事件主题**：通知的核心事项（如“国家奖学金候选人公示”）。
+   - **发起单位**：发布通知的机构或部门（如“商学院”）。
+   - **主要行动**：通知中的核心决定或步骤（如“推荐候选人”“公示结果”）。
+   - **关键细节**：包括具体名单、时间节点（如公示截止日期）、地点、联系方式等。
+   - **目的或要求**：如“征询意见”或“反馈方式”。
+
+2. **摘要格式**：
+   - 语言简洁、正式，直接陈述事实。
+   - 避免使用修饰性词语（如“重要”“隆重”）和主观表述（如“值得祝贺”）。
+
+3. **约束条件**：
+   - 仅总结通知中明确提及的内容，不推断未说明的信息。
+   - 忽略通知中的格式性文字（如“特此通知”“附件下载”）。
+   - 直接返回摘要文本，不输出任何其他信息。
 
-    def __init__(self, target_date: str | None = None) -> None:
-        self.config = Config()
+请基于以下通知生成摘要："""
+    BATCH_INSTRUCTION = (
+        "本次输入包含多条互不相关的通知，每条以【编号】开头。"
+        "请按上述要求分别为每条通知生成摘要，只输出一个 JSON 对象，"
+        "键为通知编号的字符串形式（如 \"1\"），值为该通知的摘要文本，不要输出任何其他内容。"
+    )
+
+    def __init__(
+        self,
+        target_date: str | None = None,
+        incremental: bool | None = None,
+        config: Config | None = None,
+    ) -> None:
+        self.config = config or Config()
         self.config.ensure_directories()
         self.events_dir: Path = self.config.events_dir
+        self.store: EventStore = open_store(self.config)
         self.target_date = self._normalize_date(target_date)
-        self.payload = {"pageindex": "1", "pagesize": "50", "fwdw": "-1"}
+        # 默认连接真实服务，可通过 OA_BASE_URL / AI_URL 指向本地替身（如基准测试）
+        self.oa_host = (self.config.oa_base_url or self.OA_HOST).rstrip("/")
+        self.listing_url = f"{self.oa_host}{self.LISTING_PATH}"
+        self.ai_url = self.config.ai_url or self.AI_URL
+        self.page_size = self.config.oa_page_size
+        self.payload = {"pageindex": "1", "pagesize": str(self.page_size), "fwdw": "-1"}
         self.events: list[dict[str, str]] = []
+        # OA 门户与 GLM 各自独立的并发上限
+        self._oa_slots = threading.BoundedSemaphore(self.config.oa_concurrency)
+        self._ai_slots = threading.BoundedSemaphore(self.config.ai_concurrency)
+        # 每个主机一个长连接池，列表页、详情页与 AI 调用共用
+        self._oa_session = self._build_session(self.config.http_pool_size)
+        self._ai_session = self._build_session(self.config.http_pool_size)
+        self.summary_cache = SummaryCache(
+            self.config.cache_dir / "summaries.sqlite3",
+            max_bytes=self.config.summary_cache_max_mb * 1024 * 1024,
+            max_age_days=self.config.summary_cache_max_age_days,
+        )
+        # 详情页 HTTP 缓存（按 URL，优先用 ETag/Last-Modified 重新验证，否则按 TTL 复用）
+        self.page_cache = (
+            PageCache(
+                self.config.cache_dir / "pages.sqlite3",
+                max_bytes=self.config.http_cache_max_mb * 1024 * 1024,
+                ttl_seconds=self.config.http_cache_ttl_hours * 3600,
+            )
+            if self.config.http_cache
+            else None
+        )
+        self.incremental = self.config.incremental if incremental is None else incremental
+        # _post 与 _call_ai 共用的重试策略，以及 GLM 每秒请求数限制
+        self.retry = RetryPolicy(
+            attempts=self.config.retry_attempts,
+            base_delay=self.config.retry_base_delay,
+            max_delay=self.config.retry_max_delay,
+            deadline_seconds=self.config.run_deadline,
+        )
+        self.ai_limiter = TokenBucket(self.config.ai_rate)
+        # 流式模式下每次 AI 调用的 (首字耗时, 总耗时)
+        self.ai_timings: list[tuple[float | None, float]] = []
+        self.seen_index = SeenIndex(self.config.cache_dir / "seen.sqlite3")
+        # 近似重复检测：被合并掉的链接，以及吸收了重复项（发布单位有变化）的链接
+        self.dedup = (
+            Deduplicator(
+                self.config.cache_dir / "dedup.sqlite3",
+                window_days=self.config.dedup_window_days,
+                threshold=self.config.dedup_threshold,
+            )
+            if self.config.dedup
+            else None
+        )
+        self.collapsed_links: set[str] = set()
+        self.merged_links: set[str] = set()
+        # 同日标题规范化后相同的其他通知，作为正文比对的额外候选
+        self.title_peers: dict[str, list[str]] = {}
+        # 正在调用 AI 的通知（链接 -> 摘要 Future），相似通知等待其结果而不是重复调用
+        self._dedup_lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._awaiting: dict[str, Future] = {}
 
     def run(self) -> None:
         print(f"开始抓取 {self.target_date} 的OA通知...")
-        page = self._post(self.BASE_URL, self.payload)
-        if not page:
-            print("获取OA页面失败，无法继续处理")
-            return
-
-        events = self._parse_events(page)
+        self._reset_run_state()
+        self.retry.start_run()
+        events = [
+            row for row in self._iter_listing(self.target_date)
+            if row["发布日期"] == self.target_date
+        ]
+        print(f"成功提取{len(events)}条事件")
         if not events:
             print(f"{self.target_date} 没有需要记录的通知")
             return
 
         self.events = events
-        self._fill_summaries()
+        self._index_titles(events)
+        self._fill_summaries(self._pending_events(self.events))
+        self.events = self._collapse_duplicates(self.events)
         self._save_events()
+        print(self.summary_cache.stats())
+        self._report_ai_timings()
+
+    def run_range(self, start_date: str, end_date: str | None = None) -> None:
+        """回填 ``start_date`` 至 ``end_date`` 的每日文件，列表只抓取一遍，详情与摘要共用一个任务队列。"""
+        start = self._normalize_date(start_date)
+        end = self._normalize_date(end_date)
+        if start > end:
+            raise ValueError("起始日期不能晚于结束日期")
+
+        print(f"开始抓取 {start} 至 {end} 的OA通知...")
+        self._reset_run_state()
+        self.retry.start_run()
+        by_day: dict[str, list[dict[str, str]]] = {}
+        for row in self._iter_listing(start):
+            if row["发布日期"] <= end:
+                by_day.setdefault(row["发布日期"], []).append(row)
+
+        if not by_day:
+            print(f"{start} 至 {end} 没有需要记录的通知")
+            return
+
+        days = sorted(by_day)
+        self.events = [event for day in days for event in by_day[day]]
+        self._index_titles(self.events)
+        print(f"成功提取{len(self.events)}条事件，覆盖 {len(days)} 天")
+
+        began = time.perf_counter()
+        pending = self._pending_events(self.events)
+        finished = self._fill_summaries(pending)
+        finished_at = {id(event): moment for event, moment in zip(pending, finished)}
+        for day in days:
+            day_events = self._collapse_duplicates(by_day[day])
+            self._save_events(day, day_events)
+            elapsed = max(finished_at.get(id(event), began) for event in day_events) - began
+            print(f"{day}: {len(day_events)} 条，{elapsed:.1f}s 内完成，{self._rate(len(day_events), elapsed)}")
+
+        elapsed = time.perf_counter() - began
+        print(f"合计 {len(self.events)} 条，用时 {elapsed:.1f}s，{self._rate(len(self.events), elapsed)}")
+        print(self.summary_cache.stats())
+        self._report_ai_timings()
+
+    def _reset_run_state(self) -> None:
+        """清空上一次运行的统计与合并记录；守护模式下同一实例会反复运行。"""
+        self.ai_timings = []
+        self.collapsed_links = set()
+        self.merged_links = set()
+        self.title_peers = {}
+        self._inflight = {}
+        self._awaiting = {}
+        self.summary_cache.hits = self.summary_cache.misses = 0
+
+    def _report_ai_timings(self) -> None:
+        if not self.ai_timings:
+            return
+        first_tokens = sorted(first for first, _ in self.ai_timings if first is not None)
+        totals = sorted(total for _, total in self.ai_timings)
+        median_first = f"{first_tokens[len(first_tokens) // 2]:.2f}s" if first_tokens else "--"
+        print(
+            f"AI 流式调用 {len(totals)} 次，首字耗时中位数 {median_first}，"
+            f"生成耗时中位数 {totals[len(totals) // 2]:.2f}s，最长 {totals[-1]:.2f}s"
+        )
+
+    @staticmethod
+    def _rate(count: int, elapsed: float) -> str:
+        return f"{count / elapsed:.2f} 条/秒" if elapsed > 0 else "-- 条/秒"
+
+    def close(self) -> None:
+        self._oa_session.close()
+        self._ai_session.close()
+        self.summary_cache.close()
+        if self.page_cache:
+            self.page_cache.close()
+        self.seen_index.close()
+        if self.dedup:
+            self.dedup.close()
+        self.store.close()
+
+    def _pending_events(self, events: list[dict[str, str]]) -> list[dict[str, str]]:
+        """增量模式下沿用索引中已处理且列表信息未变化的摘要，只返回需要抓取的事件。"""
+        if not self.incremental:
+            return list(events)
+
+        pending: list[dict[str, str]] = []
+        for event in events:
+            seen = self.seen_index.is_current(event)
+            if seen is not None:
+                event["摘要"] = seen["summary"]
+            else:
+                pending.append(event)
+        print(f"新增或变化的通知 {len(pending)} 条，沿用已有摘要 {len(events) - len(pending)} 条")
+        return pending
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def _post(
+        self, url: str, data: dict[str, str] | None = None, cache: bool = False, refresh: bool = False
+    ) -> str | None:
+        """POST 请求 OA；``cache`` 为真时先查详情页缓存，带校验信息的页面发条件请求。
+
+        ``refresh`` 为真时不使用 TTL 内的缓存，总是请求门户（仍会写回缓存）。
+        """
+        kind = "listing" if url == self.listing_url else "detail"
+        cached, fresh = self._lookup_page(url, cache, refresh)
+        if fresh is not None:
+            return fresh
+        headers = cached.conditional_headers() if cached else None
+
+        def attempt() -> str:
+            response = self._oa_session.post(url, data=data, headers=headers or None, timeout=self.retry.timeout(30))
+            METRICS.inc("oa_response_bytes_total", len(response.content), kind=kind)
+            if response.status_code == 304 and cached is not None:
+                return self._revalidated(url, cached)
+            self._check_status(response)
+            if cache:
+                self._store_page(url, cached, response.text, response.headers)
+            return response.text
 
-    def _post(self, url: str, data: dict[str, str] | None = None) -> str | None:
         try:
-            response = requests.post(url, data=data, timeout=30)
-            if response.status_code == 200:
-                return response.text
-            print(f"请求失败，状态码: {response.status_code}")
-        except requests.RequestException as exc:
+            with METRICS.timed("oa_request", kind=kind):
+                return self.retry.call(attempt, self._classify_error, f"请求 {url}", service="oa")
+        except HTTPStatusError as exc:
+            print(f"请求失败，状态码: {exc.status_code}")
+        except (requests.RequestException, DeadlineExceeded) as exc:
             print(f"请求 {url} 失败: {exc}")
         return None
 
-    def _parse_events(self, html: str) -> list[dict[str, str]]:
-        soup = BeautifulSoup(html, "html.parser")
+    def _lookup_page(self, url: str, cache: bool, refresh: bool = False) -> tuple[CachedPage | None, str | None]:
+        """返回 ``(缓存条目, 可直接使用的正文)``；未启用缓存或无需请求时对应位置为 None。"""
+        if not cache or self.page_cache is None:
+            return None, None
+        cached = self.page_cache.get(url)
+        if cached is not None and not refresh and self.page_cache.is_fresh(cached):
+            self.page_cache.touch(url)
+            METRICS.inc("page_cache_lookups_total", result="fresh")
+            return cached, cached.body
+        return cached, None
+
+    def _revalidated(self, url: str, cached: CachedPage) -> str:
+        self.page_cache.touch(url, revalidated=True)
+        METRICS.inc("page_cache_lookups_total", result="not_modified")
+        return cached.body
+
+    def _store_page(self, url: str, cached: CachedPage | None, text: str, headers: Mapping[str, str]) -> None:
+        if self.page_cache is None:
+            return
+        self.page_cache.put(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+        METRICS.inc("page_cache_lookups_total", result="miss" if cached is None else "changed")
+
+    @classmethod
+    def _check_status(cls, response: requests.Response) -> None:
+        cls._raise_for_status(response.status_code, response.headers)
+
+    @staticmethod
+    def _raise_for_status(status: int, headers: Mapping[str, str]) -> None:
+        if status != 200:
+            raise HTTPStatusError(status, parse_retry_after(headers.get("Retry-After")))
+
+    @staticmethod
+    def _classify_error(exc: Exception) -> tuple[bool, float | None]:
+        """返回 ``(是否可重试, 服务端建议的等待秒数)``，只有瞬时错误才重试。"""
+        if isinstance(exc, HTTPStatusError):
+            return exc.transient, exc.retry_after
+        if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return True, None
+        if isinstance(exc, ValueError):
+            # 200 但 JSON 被截断，通常是连接中途断开
+            return True, None
+        return False, None
+
+    def _iter_listing(self, stop_before: str) -> Iterator[dict[str, str]]:
+        """按页惰性产出列表行（发布日期倒序），遇到早于 ``stop_before`` 的行即停止翻页。
+
+        门户每页返回的行数可能少于 ``OA_PAGE_SIZE``，个别行也可能解析失败，因此不按行数判断末页：
+        只有整页没有 ``datalight`` 行，或与上一页完全相同（越界页码被门户截到最后一页）时才停止。
+        """
+        previous: list[dict[str, str]] | None = None
+        for page_index in itertools.count(1):
+            payload = {**self.payload, "pageindex": str(page_index)}
+            page = self._post(self.listing_url, payload)
+            if not page:
+                print(f"获取OA列表第{page_index}页失败，停止翻页")
+                return
+
+            if not _DATALIGHT_PATTERN.search(page):
+                return
+            rows = self._parse_rows(page, self.oa_host)
+            if rows and rows == previous:
+                return
+            previous = rows
+            for row in rows:
+                if row["发布日期"] < stop_before:
+                    return
+                yield row
+
+    @classmethod
+    def _parse_rows(cls, html: str, host: str | None = None) -> list[dict[str, str]]:
+        with METRICS.timed("parse_listing"):
+            return cls._parse_tbody(html, host)
+
+    @classmethod
+    def _parse_tbody(cls, html: str, host: str | None) -> list[dict[str, str]]:
+        # 只解析从第一个 <tbody> 开始的片段，且只为 tbody 建树，跳过页头脚本与导航
+        start = _TBODY_PATTERN.search(html)
+        if not start:
+            return []
+        soup = BeautifulSoup(html[start.start():], HTML_PARSER, parse_only=SoupStrainer("tbody"))
         tbody = soup.find("tbody")
         if not tbody:
             return []
@@ -71,12 +395,6 @@ class OA:
             if not link:
                 continue
 
-            date = cells[2].get_text(strip=True)
-            if date > self.target_date:
-                continue
-            if date < self.target_date:
-                break
-
             href = link.get("href", "").strip()
             if not href:
                 continue
@@ -84,12 +402,11 @@ class OA:
             result.append(
                 {
                     "标题": link.get("title", "").strip() or link.get_text(strip=True),
-                    "链接": f"http://oa.stu.edu.cn{href}",
+                    "链接": f"{host or cls.OA_HOST}{href}",
                     "发布单位": cells[1].get_text(strip=True),
-                    "发布日期": date,
+                    "发布日期": cells[2].get_text(strip=True),
                 }
             )
-        print(f"成功提取{len(result)}条事件")
         return result
 
     @staticmethod
@@ -104,39 +421,352 @@ class OA:
 
         return parsed.strftime("%Y-%m-%d")
 
-    def _fill_summaries(self) -> None:
-        total = len(self.events)
+    def _fill_summaries(self, events: list[dict[str, str]] | None = None) -> list[float]:
+        """并发补全事件摘要（默认 ``self.events``），返回每条事件完成时的 ``perf_counter`` 时间。"""
+        events = self.events if events is None else events
+        total = len(events)
         if total == 0:
-            return
-
-        print(f"开始生成摘要，共 {total} 条事件")
-        for index, event in enumerate(self.events, start=1):
-            title = event.get("标题", "[无标题]")
-            print(f"[{index}/{total}] 拉取详情: {title}")
+            return []
 
-            detail_html = self._post(event["链接"], self.payload)
-            if not detail_html:
-                event["摘要"] = "[获取摘要失败]"
-                print(f"[{index}/{total}] 详情获取失败，已标记占位摘要")
-                continue
+        workers = min(self.config.spider_workers, total)
+        print(f"开始生成摘要，共 {total} 条事件，并发数 {workers}")
+        deferred: list[tuple[int, dict[str, str], str, str]] | None = [] if self.config.ai_batch else None
+        # 事件字典原地更新，保存时仍按列表原始顺序输出
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._summarize_event, index, total, event, deferred)
+                for index, event in enumerate(events, start=1)
+            ]
+            finished = [future.result() for future in futures]
+
+            if deferred:
+                batches = self._pack_batches(sorted(deferred, key=lambda item: item[0]))
+                print(f"短通知 {len(deferred)} 条，合并为 {len(batches)} 个批量摘要请求")
+                batch_futures = [pool.submit(self._summarize_batch, batch, total) for batch in batches]
+                for batch, future in zip(batches, batch_futures):
+                    moment = future.result()
+                    for index, *_ in batch:
+                        finished[index - 1] = moment
+        return finished
+
+    def _summarize_event(
+        self,
+        index: int,
+        total: int,
+        event: dict[str, str],
+        deferred: list[tuple[int, dict[str, str], str, str]] | None = None,
+    ) -> float:
+        """处理单条事件；短通知在批量模式下放入 ``deferred`` 并返回 0，由批量请求补全。"""
+        article = self._fetch_article(index, total, event)
+        if article is None:
+            return time.perf_counter()
+        return self._summarize_fetched(index, total, event, article, deferred)
+
+    def _fetch_article(self, index: int, total: int, event: dict[str, str]) -> str | None:
+        """拉取并清洗详情页；失败时写入占位摘要并返回 None。"""
+        title = event.get("标题", "[无标题]")
+        print(f"{self._progress(index, total)} 拉取详情: {title}")
+
+        with self._oa_slots:
+            detail_html = self._post(event["链接"], self.payload, cache=True, refresh=self._needs_refresh(event))
+        if not detail_html:
+            self._mark_failed(index, total, event, "[获取摘要失败]", "详情获取失败")
+            return None
+        return self._clean_html(detail_html)
+
+    def _needs_refresh(self, event: dict[str, str]) -> bool:
+        """新出现或列表行有变化的通知必须从门户重新拉取，TTL 内的缓存可能是修改前的正文。
+
+        只有此前抓取失败、列表行未变的通知（如中断后重跑）才直接使用缓存。
+        """
+        previous = self.seen_index.get(event["链接"])
+        return previous is None or previous["listing_hash"] != SeenIndex.listing_hash(event)
+
+    def _mark_failed(self, index: int, total: int, event: dict[str, str], placeholder: str, reason: str) -> None:
+        event["摘要"] = placeholder
+        self.seen_index.record(event, None, SeenIndex.STATUS_FAILED)
+        print(f"{self._progress(index, total)} {reason}，已标记占位摘要")
+
+    def _summarize_fetched(
+        self,
+        index: int,
+        total: int,
+        event: dict[str, str],
+        article: str,
+        deferred: list[tuple[int, dict[str, str], str, str]] | None = None,
+    ) -> float:
+        content_hash = SeenIndex.hash_text(article)
+        try:
+            finished = self._resolve_without_ai(index, total, event, article, content_hash, deferred)
+            if finished is not None:
+                return finished
+            waiting = self._awaiting.pop(event["链接"], None)
+            summary = self._reused_summary(index, total, waiting.result()) if waiting else None
+            if summary is None:
+                summary = self._summarize_article(article)
+            return self._apply_summary(index, total, event, summary, content_hash, article)
+        finally:
+            self._settle(event["链接"], None)
+
+    def _resolve_without_ai(
+        self,
+        index: int,
+        total: int,
+        event: dict[str, str],
+        article: str,
+        content_hash: str,
+        deferred: list[tuple[int, dict[str, str], str, str]] | None,
+    ) -> float | None:
+        """正文未变化、摘要缓存命中或放入批量队列时返回完成时间，需要调用 AI 时返回 None。
+
+        正文与一条正在生成摘要的通知相似时同样返回 None，并把要等待的 Future 放在 ``_awaiting`` 中。
+        """
+        previous = self.seen_index.get(event["链接"])
+        if (
+            self.incremental
+            and previous is not None
+            and previous["status"] == SeenIndex.STATUS_OK
+            and previous["content_hash"] == content_hash
+        ):
+            event["摘要"] = previous["summary"]
+            self.seen_index.record(event, content_hash, SeenIndex.STATUS_OK)
+            print(f"{self._progress(index, total)} 正文未变化，沿用已有摘要")
+            return time.perf_counter()
+
+        duplicate = self._near_duplicate_summary(index, total, event, article)
+        if isinstance(duplicate, Future):
+            self._awaiting[event["链接"]] = duplicate
+            return None
+        summary = duplicate if duplicate is not None else self._cached_summary(article)
+        if summary is not None:
+            return self._apply_summary(index, total, event, summary, content_hash)
+        if len(article) <= self.config.local_summary_threshold:
+            summary = self._local_summary(article, "short")
+            if summary:
+                print(f"{self._progress(index, total)} 正文较短，使用本地摘要")
+                return self._apply_summary(index, total, event, summary, content_hash)
+        if deferred is not None and len(article) <= self.config.ai_batch_item_max_chars:
+            # 批量请求要等所有详情处理完才发出，不能让相似通知在此期间占着线程等待
+            self._settle(event["链接"], None)
+            deferred.append((index, event, article, content_hash))
+            print(f"{self._progress(index, total)} 短通知，加入批量摘要队列")
+            return 0.0
+        return None
 
-            article = self._clean_html(detail_html)
-            summary = self._call_ai(article)
-            if not summary:
-                print(f"[{index}/{total}] 摘要生成失败，已使用占位文本")
+    @staticmethod
+    def _progress(index: int, total: int) -> str:
+        """进度前缀；流水线模式下总数未知（total 为 0）时只显示序号。"""
+        return f"[{index}/{total}]" if total else f"[{index}]"
+
+    def _apply_summary(
+        self,
+        index: int,
+        total: int,
+        event: dict[str, str],
+        summary: str | None,
+        content_hash: str,
+        article: str | None = None,
+    ) -> float:
+        """写入摘要并记录索引；AI 失败且提供了 ``article`` 时改用本地摘要。"""
+        failed = not summary or self._is_placeholder(summary)
+        if failed and article and self.config.local_summary_fallback:
+            fallback = self._local_summary(article, "fallback")
+            if fallback:
+                print(f"{self._progress(index, total)} AI 摘要失败（{summary or '无返回'}），改用本地摘要")
+                event["摘要"] = fallback
+                # 仍记为失败，下次运行会重新尝试 AI
+                self.seen_index.record(event, content_hash, SeenIndex.STATUS_FAILED)
+                return time.perf_counter()
+
+        if not summary:
+            print(f"{self._progress(index, total)} 摘要生成失败，已使用占位文本")
+        else:
+            print(f"{self._progress(index, total)} 摘要生成完成")
+
+        # 清理摘要中的 # 号和开头的空格
+        if summary:
+            summary = summary.lstrip('# ').lstrip()
+
+        event["摘要"] = summary or "[摘要生成失败]"
+        status = SeenIndex.STATUS_FAILED if self._is_placeholder(event["摘要"]) else SeenIndex.STATUS_OK
+        self.seen_index.record(event, content_hash, status)
+        self._settle(event["链接"], event["摘要"] if status == SeenIndex.STATUS_OK else None)
+        return time.perf_counter()
+
+    def _near_duplicate_summary(
+        self, index: int, total: int, event: dict[str, str], article: str
+    ) -> "str | Future | None":
+        """在近期正文中查找近似重复；同日重复记下对应关系供保存前合并，已有摘要时直接沿用。
+
+        相似通知仍在生成摘要时返回其 Future 供调用方等待；没有匹配时登记自己为进行中。
+        """
+        if self.dedup is None:
+            return None
+        link = event["链接"]
+        signature = self.dedup.signature(article)
+        with self._dedup_lock:
+            match = self.dedup.find(link, signature, event["发布日期"], self.title_peers.get(link, ()))
+            self.dedup.add(link, event["发布日期"], signature)
+            if match is None:
+                self._inflight[link] = Future()
+                return None
+
+            url, date, score = match
+            url = self.dedup.canonical(url) or url
+            if date == event["发布日期"]:
+                self.dedup.mark_duplicate(link, url, date)
+            pending = self._inflight.get(url)
+            if pending is not None and not pending.done():
+                print(f"{self._progress(index, total)} 与正在处理的通知正文相似度 {score:.0%}，等待其摘要")
+                return pending
+            previous = self.seen_index.get(url)
+            if previous is None or previous["status"] != SeenIndex.STATUS_OK or not previous["summary"]:
+                self._inflight[link] = Future()
+                return None
+        METRICS.inc("dedup_total", kind="content")
+        print(f"{self._progress(index, total)} 与已处理通知正文相似度 {score:.0%}，沿用其摘要")
+        return previous["summary"]
+
+    def _reused_summary(self, index: int, total: int, summary: str | None) -> str | None:
+        """等待到的相似通知摘要；对方失败时返回 None，由调用方自行调用 AI。"""
+        if summary is None:
+            print(f"{self._progress(index, total)} 相似通知摘要失败，单独生成摘要")
+            return None
+        METRICS.inc("dedup_total", kind="content")
+        print(f"{self._progress(index, total)} 沿用相似通知的摘要")
+        return summary
+
+    def _settle(self, link: str, summary: str | None) -> None:
+        """结束 ``link`` 的进行中登记，唤醒等待它的相似通知。"""
+        with self._dedup_lock:
+            pending = self._inflight.get(link)
+            if pending is not None and not pending.done():
+                pending.set_result(summary)
+
+    def _index_titles(self, events: list[dict[str, str]]) -> None:
+        """按同日规范化标题分组，组内通知互为正文比对的候选。
+
+        “讲座通知”之类的通用标题很常见，标题相同不代表内容相同，是否合并仍由正文相似度决定。
+        """
+        if self.dedup is None:
+            return
+        groups: dict[tuple[str, str], list[str]] = {}
+        for event in events:
+            key = self.dedup.title_key(event.get("标题", ""))
+            if key:
+                groups.setdefault((event["发布日期"], key), []).append(event["链接"])
+        for links in groups.values():
+            if len(links) > 1:
+                for link in links:
+                    self.title_peers[link] = [peer for peer in links if peer != link]
+
+    def _collapse_duplicates(self, events: list[dict[str, str]]) -> list[dict[str, str]]:
+        """把正文判定为同日重复的通知合并到对应的事件中。
+
+        同一组重复通知保留列表中最靠前的一条，结果不受并发处理先后的影响。
+        """
+        if self.dedup is None:
+            return events
+        targets: dict[str, dict[str, str]] = {}
+        kept: list[dict[str, str]] = []
+        for event in events:
+            key = self.dedup.canonical(event["链接"]) or event["链接"]
+            target = targets.setdefault(key, event)
+            if target is event:
+                kept.append(event)
             else:
-                print(f"[{index}/{total}] 摘要生成完成")
-            
-            # 清理摘要中的 # 号和开头的空格
+                self._absorb(target, event, "content")
+        return kept
+
+    def _absorb(self, target: dict[str, str], duplicate: dict[str, str], kind: str) -> None:
+        units = event_units(target)
+        for unit in event_units(duplicate):
+            if unit not in units:
+                units.append(unit)
+        target["发布单位"] = UNIT_SEPARATOR.join(units)
+        self.collapsed_links.add(duplicate["链接"])
+        self.merged_links.add(target["链接"])
+        METRICS.inc("dedup_total", kind=kind)
+        print(f"「{duplicate.get('标题', '')}」（{duplicate['发布单位']}）与「{target.get('标题', '')}」重复，已合并")
+
+    def _local_summary(self, article: str, reason: str) -> str:
+        """不联网的抽取式摘要，用于短通知和 AI 失败时的兜底。"""
+        with METRICS.timed("local_summary", reason=reason):
+            return summarize_extractive(article, self.config.local_summary_max_chars)
+
+    def _cache_key(self, article: str) -> str:
+        return self.summary_cache.make_key(article, self.AI_MODEL, self.SYSTEM_PROMPT)
+
+    def _cached_summary(self, article: str) -> str | None:
+        return self.summary_cache.get(self._cache_key(article))
+
+    def _summarize_article(self, article: str) -> str | None:
+        """调用 AI 生成单条摘要并写入缓存（调用方已确认缓存未命中）。"""
+        with self._ai_slots:
+            summary = self._call_ai(article)
+        self._remember_summary(article, summary)
+        return summary
+
+    def _remember_summary(self, article: str, summary: str | None) -> None:
+        if summary and not self._is_placeholder(summary):
+            self.summary_cache.put(self._cache_key(article), summary)
+
+    def _pack_batches(
+        self, items: list[tuple[int, dict[str, str], str, str]]
+    ) -> list[list[tuple[int, dict[str, str], str, str]]]:
+        """按字符数（中文约等于 token 数）把短通知装箱，每批不超过 ``ai_batch_token_budget``。"""
+        batches: list[list[tuple[int, dict[str, str], str, str]]] = []
+        current: list[tuple[int, dict[str, str], str, str]] = []
+        used = 0
+        for item in items:
+            cost = len(item[2])
+            if current and used + cost > self.config.ai_batch_token_budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _summarize_batch(self, batch: list[tuple[int, dict[str, str], str, str]], total: int) -> float:
+        articles = [article for _, _, article, _ in batch]
+        if len(batch) == 1:
+            results = None
+        else:
+            with self._ai_slots:
+                results = self._call_ai_batch(articles)
+            if results is None:
+                print(f"批量摘要解析失败，{len(batch)} 条通知改为逐条生成")
+
+        moment = time.perf_counter()
+        for position, (index, event, article, content_hash) in enumerate(batch, start=1):
+            summary = (results or {}).get(str(position))
             if summary:
-                summary = summary.lstrip('# ').lstrip()
-            
-            event["摘要"] = summary or "[摘要生成失败]"
+                self.summary_cache.put(self._cache_key(article), summary)
+            else:
+                summary = self._summarize_article(article)
+            moment = self._apply_summary(index, total, event, summary, content_hash, article)
+        return moment
+
+    @staticmethod
+    def _is_placeholder(summary: str) -> bool:
+        """占位摘要形如 ``[AI请求超时]``，不应写入缓存。"""
+        return summary.startswith("[") and summary.endswith("]")
 
     def _clean_html(self, text: str) -> str:
+        with METRICS.timed("clean_html"):
+            return self._strip_html(text)
+
+    def _strip_html(self, text: str) -> str:
+        article = extract_article(text, HTML_PARSER, self.config.ai_input_max_chars)
+        if article:
+            return article
+
+        # 未识别出正文容器时退回整页去标签
         text = re.sub(r"^.*?}", "", text, flags=re.DOTALL)
         text = re.sub(r"<.*?>", "", text)
-        return re.sub(r"\s+", "", text)
+        return re.sub(r"\s+", "", text)[: self.config.ai_input_max_chars]
 
     def _call_ai(self, content: str) -> str | None:
         headers = dict(self.config.ai_headers)
@@ -144,37 +774,48 @@ class OA:
             print("AI API_KEY 未配置，跳过摘要生成")
             return "[AI 未配置]"
 
-        payload = {
-            "model": "glm-4.5-flash",
+        payload = self._ai_payload(content)
+        try:
+            with METRICS.timed("ai_request", mode="stream" if self.config.ai_stream else "json"):
+                if self.config.ai_stream:
+                    payload["stream"] = True
+                    content = self._request_ai_stream(payload, headers, timeout=60)
+                else:
+                    data = self._request_ai(payload, headers, timeout=60)
+        except requests.exceptions.Timeout:
+            print("AI API请求超时")
+            return "[AI请求超时]"
+        except DeadlineExceeded as exc:
+            print(exc)
+            return "[AI请求超时]"
+        except requests.exceptions.ConnectionError:
+            print("AI API连接错误")
+            return "[AI连接失败]"
+        except HTTPStatusError as exc:
+            print(f"AI API返回错误状态码: {exc.status_code}")
+            return "[AI服务异常]"
+        except ValueError as exc:
+            print(f"解析AI API返回的JSON时出错: {exc}")
+            return "[AI返回解析失败]"
+        except requests.RequestException as exc:
+            print(f"调用AI API时发生错误: {exc}")
+            return "[AI调用失败]"
+
+        if not self.config.ai_stream:
+            choices = data.get("choices") or []
+            if not choices:
+                print("AI API返回格式异常: 没有choices字段")
+                return "[AI返回格式异常]"
+            content = choices[-1]["message"].get("content", "")
+        return self._tidy_summary(content)
+
+    def _ai_payload(self, content: str) -> dict:
+        return {
+            "model": self.AI_MODEL,
             "messages": [
                 {
                     "role": "system",
-                    "content": (
-                        """角色设定：
-你是一个专业的事件通知摘要生成器，擅长从各类通知公告中提取核心信息，并生成客观、中立的简短摘要。
-
-目标任务：
-请根据用户输入的通知事件消息（如公示、公告、通知等），提取关键要素，生成一段简洁的摘要。摘要需完全基于文本事实，不添加任何主观评价或额外信息。
-
-具体要求：
-1. **提取关键要素**：
-   - **事件主题**：通知的核心事项（如“国家奖学金候选人公示”）。
-   - **发起单位**：发布通知的机构或部门（如“商学院”）。
-   - **主要行动**：通知中的核心决定或步骤（如“推荐候选人”“公示结果”）。
-   - **关键细节**：包括具体名单、时间节点（如公示截止日期）、地点、联系方式等。
-   - **目的或要求**：如“征询意见”或“反馈方式”。
-
-2. **摘要格式**：
-   - 语言简洁、正式，直接陈述事实。
-   - 避免使用修饰性词语（如“重要”“隆重”）和主观表述（如“值得祝贺”）。
-
-3. **约束条件**：
-   - 仅总结通知中明确提及的内容，不推断未说明的信息。
-   - 忽略通知中的格式性文字（如“特此通知”“附件下载”）。
-   - 直接返回摘要文本，不输出任何其他信息。
-
-请基于以下通知生成摘要："""
-                    ),
+                    "content": self.SYSTEM_PROMPT,
                 },
                 {"role": "user", "content": content},
             ],
@@ -183,173 +824,156 @@ class OA:
             "max_tokens": 2000,
         }
 
-        try:
-            response = requests.post(self.AI_URL, json=payload, headers=headers, timeout=60)
-            if response.status_code != 200:
-                print(f"AI API返回错误状态码: {response.status_code}")
-                return "[AI服务异常]"
-
-            data = response.json()
-            choices = data.get("choices") or []
-            if not choices:
-                print("AI API返回格式异常: 没有choices字段")
-                return "[AI返回格式异常]"
+    @staticmethod
+    def _tidy_summary(content: str) -> str:
+        content = content.strip()
+        content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
+        content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
+        content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
+
+        return content
+
+    def _request_ai(self, payload: dict, headers: dict[str, str], timeout: float) -> dict:
+        """按统一重试策略调用 GLM，每次尝试前先从令牌桶取令牌。"""
+        def attempt() -> dict:
+            self.ai_limiter.acquire()
+            response = self._ai_session.post(
+                self.ai_url, json=payload, headers=headers, timeout=self.retry.timeout(timeout)
+            )
+            METRICS.inc("ai_response_bytes_total", len(response.content))
+            self._check_status(response)
+            return response.json()
+
+        return self.retry.call(attempt, self._classify_error, "AI API", service="ai")
+
+    def _request_ai_stream(self, payload: dict, headers: dict[str, str], timeout: float) -> str:
+        """以 SSE 流式读取摘要，边读边丢弃思考内容，达到长度上限即断开，并记录首字与总耗时。"""
+        def attempt() -> str:
+            self.ai_limiter.acquire()
+            started = time.perf_counter()
+            with self._ai_session.post(
+                self.ai_url, json=payload, headers=headers, timeout=self.retry.timeout(timeout), stream=True
+            ) as response:
+                self._check_status(response)
+                # 先按字节切行再整行按 UTF-8 解码：iter_lines(decode_unicode=True) 会按响应头推断的编码
+                # （text/event-stream 未声明 charset 时为 ISO-8859-1）逐块解码，中文会变成乱码
+                lines = (line.decode("utf-8") for line in response.iter_lines())
+                text, first_token, truncated = read_stream(lines, started, self.config.ai_summary_max_chars)
+            self._record_stream(text, first_token, time.perf_counter() - started, truncated)
+            return text
+
+        return self.retry.call(attempt, self._classify_error, "AI API", service="ai")
+
+    def _record_stream(self, text: str, first_token: float | None, total: float, truncated: bool) -> None:
+        self.ai_timings.append((first_token, total))
+        METRICS.inc("ai_response_bytes_total", len(text.encode("utf-8")))
+        if first_token is not None:
+            METRICS.observe("ai_first_token_seconds", first_token)
+        first = f"{first_token:.2f}s" if first_token is not None else "--"
+        print(f"AI 流式摘要：首字 {first}，总计 {total:.2f}s{'（已达长度上限提前结束）' if truncated else ''}")
+
+    def _call_ai_batch(self, articles: list[str]) -> dict[str, str] | None:
+        """一次请求为多条通知生成摘要，返回 ``{"编号": 摘要}``；任何异常或格式不符返回 None。"""
+        headers = dict(self.config.ai_headers)
+        if "Authorization" not in headers:
+            return None
 
-            content = choices[-1]["message"].get("content", "").strip()
-            content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
-            content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
-            content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
+        payload = self._batch_payload(articles)
+        try:
+            with METRICS.timed("ai_request", mode="batch"):
+                choices = self._request_ai(payload, headers, timeout=120).get("choices") or []
+                text = choices[-1]["message"].get("content", "") if choices else ""
+        except (requests.RequestException, HTTPStatusError, DeadlineExceeded, ValueError, KeyError) as exc:
+            print(f"批量摘要请求失败: {exc}")
+            return None
+        return self._parse_batch_reply(text)
+
+    def _batch_payload(self, articles: list[str]) -> dict:
+        content = "\n\n".join(f"【{number}】\n{article}" for number, article in enumerate(articles, start=1))
+        return {
+            "model": self.AI_MODEL,
+            "messages": [
+                {"role": "system", "content": f"{self.SYSTEM_PROMPT}\n\n{self.BATCH_INSTRUCTION}"},
+                {"role": "user", "content": content},
+            ],
+            "stream": False,
+            "temperature": 0.7,
+            "max_tokens": 4000,
+        }
 
-            return content
-        except requests.exceptions.Timeout:
-            print("AI API请求超时，正在重试...")
-            try:
-                response = requests.post(self.AI_URL, json=payload, headers=headers, timeout=60)
-                if response.status_code != 200:
-                    print(f"AI API返回错误状态码: {response.status_code}")
-                    return "[AI服务异常]"
-
-                data = response.json()
-                choices = data.get("choices") or []
-                if not choices:
-                    print("AI API返回格式异常: 没有choices字段")
-                    return "[AI返回格式异常]"
-
-                content = choices[-1]["message"].get("content", "").strip()
-                content = re.sub(r"\<think>.*?\</think>", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
-
-                return content
-            except requests.exceptions.Timeout:
-                print("AI API请求超时")
-                return "[AI请求超时]"
-            except requests.exceptions.ConnectionError:
-                print("AI API连接错误")
-                return "[AI连接失败]"
-            except ValueError as exc:
-                print(f"解析AI API返回的JSON时出错: {exc}")
-                return "[AI返回解析失败]"
-            except requests.RequestException as exc:
-                print(f"调用AI API时发生错误: {exc}")
-                return "[AI调用失败]"
-        except requests.exceptions.ConnectionError:
-            print("AI API连接错误，正在重试...")
-            try:
-                response = requests.post(self.AI_URL, json=payload, headers=headers, timeout=60)
-                if response.status_code != 200:
-                    print(f"AI API返回错误状态码: {response.status_code}")
-                    return "[AI服务异常]"
-
-                data = response.json()
-                choices = data.get("choices") or []
-                if not choices:
-                    print("AI API返回格式异常: 没有choices字段")
-                    return "[AI返回格式异常]"
-
-                content = choices[-1]["message"].get("content", "").strip()
-                content = re.sub(r"\<think>.*?\</think>", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
-
-                return content
-            except requests.exceptions.Timeout:
-                print("AI API请求超时")
-                return "[AI请求超时]"
-            except requests.exceptions.ConnectionError:
-                print("AI API连接错误")
-                return "[AI连接失败]"
-            except ValueError as exc:
-                print(f"解析AI API返回的JSON时出错: {exc}")
-                return "[AI返回解析失败]"
-            except requests.RequestException as exc:
-                print(f"调用AI API时发生错误: {exc}")
-                return "[AI调用失败]"
-        except ValueError as exc:
-            print(f"解析AI API返回的JSON时出错: {exc}，正在重试...")
-            try:
-                response = requests.post(self.AI_URL, json=payload, headers=headers, timeout=60)
-                if response.status_code != 200:
-                    print(f"AI API返回错误状态码: {response.status_code}")
-                    return "[AI服务异常]"
-
-                data = response.json()
-                choices = data.get("choices") or []
-                if not choices:
-                    print("AI API返回格式异常: 没有choices字段")
-                    return "[AI返回格式异常]"
-
-                content = choices[-1]["message"].get("content", "").strip()
-                content = re.sub(r"\<think>.*?\</think>", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
-
-                return content
-            except requests.exceptions.Timeout:
-                print("AI API请求超时")
-                return "[AI请求超时]"
-            except requests.exceptions.ConnectionError:
-                print("AI API连接错误")
-                return "[AI连接失败]"
-            except ValueError as exc:
-                print(f"解析AI API返回的JSON时出错: {exc}")
-                return "[AI返回解析失败]"
-            except requests.RequestException as exc:
-                print(f"调用AI API时发生错误: {exc}")
-                return "[AI调用失败]"
-        except requests.RequestException as exc:
-            print(f"调用AI API时发生错误: {exc}，正在重试...")
-            try:
-                response = requests.post(self.AI_URL, json=payload, headers=headers, timeout=60)
-                if response.status_code != 200:
-                    print(f"AI API返回错误状态码: {response.status_code}")
-                    return "[AI服务异常]"
-
-                data = response.json()
-                choices = data.get("choices") or []
-                if not choices:
-                    print("AI API返回格式异常: 没有choices字段")
-                    return "[AI返回格式异常]"
-
-                content = choices[-1]["message"].get("content", "").strip()
-                content = re.sub(r"\<think>.*?\</think>", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"^.*?【", "", content, flags=re.DOTALL).strip()
-                content = re.sub(r"\(.*?\)", "", content, flags=re.DOTALL).strip()
-
-                return content
-            except requests.exceptions.Timeout:
-                print("AI API请求超时")
-                return "[AI请求超时]"
-            except requests.exceptions.ConnectionError:
-                print("AI API连接错误")
-                return "[AI连接失败]"
-            except ValueError as exc:
-                print(f"解析AI API返回的JSON时出错: {exc}")
-                return "[AI返回解析失败]"
-            except requests.RequestException as exc:
-                print(f"调用AI API时发生错误: {exc}")
-                return "[AI调用失败]"
-
-    def _save_events(self) -> None:
-        if not self.events:
+    @classmethod
+    def _parse_batch_reply(cls, text: str) -> dict[str, str] | None:
+        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(parsed, dict):
+            return None
+        # 与单条摘要相同的清理，去掉编号前缀与括号注释
+        summaries = {str(key): cls._tidy_summary(value) for key, value in parsed.items() if isinstance(value, str)}
+        return {key: summary for key, summary in summaries.items() if summary}
+
+    def _save_events(self, date: str | None = None, events: list[dict[str, str]] | None = None) -> None:
+        date = date or self.target_date
+        events = self.events if events is None else events
+        if not events:
             print("没有事件数据可保存")
             return
 
-        output_file = self.events_dir / f"{self.target_date}.json"
         try:
-            with output_file.open("w", encoding="utf-8") as handle:
-                json.dump(self.events, handle, ensure_ascii=False, indent=4)
-            print(f"成功保存{len(self.events)}条事件到文件: {output_file}")
-        except OSError as exc:
+            existing = self.store.load_day(date)
+        except (OSError, ValueError) as exc:
+            print(f"读取已有事件失败，将直接覆盖: {exc}")
+            existing = None
+        if existing and self.collapsed_links:
+            existing = [event for event in existing if event.get("链接") not in self.collapsed_links]
+        events = self._merge_existing(existing, events)
+        try:
+            self.store.save_day(date, events)
+            print(f"成功保存{len(events)}条 {date} 的事件到{self._store_label(date)}")
+        except (OSError, sqlite3.Error) as exc:
             print(f"保存文件时发生错误: {exc}")
 
+    def _store_label(self, date: str) -> str:
+        if isinstance(self.store, JsonDirStore):
+            return f"文件: {self.store.path_for(date)}"
+        return f"事件库: {self.store.db_path}"
+
+    @staticmethod
+    def _merge_existing(
+        existing: list[dict[str, str]] | None, events: list[dict[str, str]]
+    ) -> list[dict[str, str]]:
+        """保留已保存但本次列表未出现的事件，本次结果按列表顺序在前。"""
+        if not existing:
+            return events
+        links = {event["链接"] for event in events}
+        return events + [event for event in existing if event.get("链接") not in links]
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="抓取OA通知并生成指定日期的JSON文件")
     parser.add_argument("--date", help="目标日期，格式 YYYY-MM-DD，默认抓取当天")
+    parser.add_argument("--from", dest="date_from", help="回填起始日期，格式 YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="回填结束日期，格式 YYYY-MM-DD，默认当天")
+    parser.add_argument("--full", action="store_true", help="忽略已处理索引，重新抓取并生成全部摘要")
     args = parser.parse_args()
 
     try:
-        OA(target_date=args.date).run()
+        spider = OA(target_date=args.date, incremental=False if args.full else None)
     except ValueError as exc:
         print(exc)
+    else:
+        try:
+            if args.date_from:
+                spider.run_range(args.date_from, args.date_to)
+            else:
+                spider.run()
+        except ValueError as exc:
+            print(exc)
+        finally:
+            spider.close()
+            export_run(spider.config, "spider")
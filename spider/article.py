@@ -0,0 +1,85 @@
+"""Main-content extraction for OA detail pages."""
+
+from __future__ import annotations
+
+import re
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+# 不含正文的页面元素；JSP 门户常把整篇正文包在 <form> 里，只去掉表单控件而不是整个表单
+_NOISE_TAGS = [
+    "script", "style", "noscript", "iframe", "head", "nav", "header", "footer",
+    "select", "option", "input", "button", "object", "embed",
+]
+_BLOCK_TAGS = {
+    "p", "div", "br", "tr", "li", "table", "h1", "h2", "h3", "h4", "h5", "h6",
+    "section", "article", "blockquote", "pre", "ul", "ol", "dl", "dt", "dd",
+}
+_CONTAINER_TAGS = {"div", "td", "article", "section", "body"}
+_INLINE_SPACE = re.compile(r"[ \t\r\f\v　\xa0]+")
+
+
+def extract_article(html: str, parser: str = "html.parser", max_chars: int = 3000) -> str:
+    """Return the main text of a detail page with paragraph breaks kept.
+
+    The container with the most text, discounted by link text, is treated as
+    the article body. The result is cut to ``max_chars`` from the head so the
+    opening of the notice, which carries the key facts, always survives.
+    """
+    soup = BeautifulSoup(html, parser)
+    for tag in soup(_NOISE_TAGS):
+        tag.decompose()
+
+    container = _find_container(soup) or soup
+    paragraphs = _paragraphs(container)
+    return _truncate(paragraphs, max_chars)
+
+
+def _find_container(soup: BeautifulSoup) -> Tag | None:
+    # 文本节点长度计入父元素，一半计入祖父元素；链接文本按负分计，避免选中导航
+    scores: dict[int, float] = {}
+    elements: dict[int, Tag] = {}
+    for node in soup.find_all(string=True):
+        text = node.strip()
+        if len(text) < 2 or not isinstance(node, NavigableString):
+            continue
+        weight = -len(text) if node.find_parent("a") else len(text)
+        parent = node.parent
+        for share in (1.0, 0.5):
+            while parent is not None and parent.name not in _CONTAINER_TAGS:
+                parent = parent.parent
+            if parent is None:
+                break
+            scores[id(parent)] = scores.get(id(parent), 0.0) + weight * share
+            elements[id(parent)] = parent
+            parent = parent.parent
+
+    if not scores:
+        return None
+    best = max(scores, key=scores.__getitem__)
+    return elements[best] if scores[best] > 0 else None
+
+
+def _paragraphs(container: Tag) -> list[str]:
+    for tag in container.find_all(_BLOCK_TAGS):
+        tag.insert_after("\n")
+    lines = (_INLINE_SPACE.sub(" ", line).strip() for line in container.get_text().split("\n"))
+    return [line for line in lines if line]
+
+
+def _truncate(paragraphs: list[str], max_chars: int) -> str:
+    kept: list[str] = []
+    used = 0
+    for paragraph in paragraphs:
+        remaining = max_chars - used
+        if remaining <= 0:
+            break
+        if len(paragraph) > remaining:
+            kept.append(paragraph[:remaining] + "……")
+            break
+        kept.append(paragraph)
+        used += len(paragraph) + 1
+    return "\n".join(kept)
+
+
+__all__ = ["extract_article"]
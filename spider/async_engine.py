@@ -0,0 +1,306 @@
+"""asyncio engine for detail fetching and summarization.
+
+``AsyncOA`` behaves like :class:`spider.OAP.OA` (same listing parsing,
+incremental index, caches and saved events) but runs the per-notice work as
+coroutines on a single ``aiohttp`` session, so a large backfill can keep many
+requests in flight without one thread per request. Listing pagination stays
+on the blocking client because each page depends on the previous one.
+
+Each notice runs as its own task; ``ASYNC_TASK_TIMEOUT`` cancels notices that
+take too long, and interrupting the run cancels every outstanding task before
+anything is saved. ``aiohttp`` is optional and only needed for this engine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Any, Coroutine
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from common.metrics import METRICS
+from common.retry import DeadlineExceeded, HTTPStatusError
+from spider.OAP import OA
+from spider.streaming import StreamCollector
+
+Deferred = list[tuple[int, dict[str, str], str, str]]
+
+
+class AsyncOA(OA):
+    """``OA`` whose detail pages and AI calls run on asyncio."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        if aiohttp is None:
+            raise RuntimeError("异步引擎需要安装 aiohttp（uv sync --extra async）")
+        super().__init__(*args, **kwargs)
+        self._aio: aiohttp.ClientSession | None = None
+
+    def _fill_summaries(self, events: list[dict[str, str]] | None = None) -> list[float]:
+        events = self.events if events is None else events
+        if not events:
+            return []
+        return asyncio.run(self._fill_summaries_async(events))
+
+    async def _fill_summaries_async(self, events: list[dict[str, str]]) -> list[float]:
+        total = len(events)
+        timeout = self.config.async_task_timeout
+        print(
+            f"开始生成摘要（asyncio），共 {total} 条事件，OA 并发 {self.config.oa_concurrency}，"
+            f"AI 并发 {self.config.ai_concurrency}" + (f"，单条超时 {timeout:g}s" if timeout else "")
+        )
+        self._oa_limit = asyncio.Semaphore(self.config.oa_concurrency)
+        self._ai_limit = asyncio.Semaphore(self.config.ai_concurrency)
+        deferred: Deferred | None = [] if self.config.ai_batch else None
+
+        connector = aiohttp.TCPConnector(limit=self.config.oa_concurrency + self.config.ai_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self._aio = session
+            try:
+                finished = await self._run_all(
+                    [self._summarize_event_async(index, total, event, deferred) for index, event in enumerate(events, start=1)]
+                )
+
+                if deferred:
+                    batches = self._pack_batches(sorted(deferred, key=lambda item: item[0]))
+                    print(f"短通知 {len(deferred)} 条，合并为 {len(batches)} 个批量摘要请求")
+                    moments = await self._run_all([self._summarize_batch_async(batch, total) for batch in batches])
+                    for batch, moment in zip(batches, moments):
+                        for index, *_ in batch:
+                            finished[index - 1] = moment
+            finally:
+                self._aio = None
+        return finished
+
+    @staticmethod
+    async def _run_all(coroutines: list[Coroutine[Any, Any, float]]) -> list[float]:
+        """Run ``coroutines`` concurrently; if one fails or the run is cancelled, cancel the rest."""
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _summarize_event_async(
+        self, index: int, total: int, event: dict[str, str], deferred: Deferred | None
+    ) -> float:
+        timeout = self.config.async_task_timeout or None
+        fetched: list[str] = []
+
+        async def work() -> float:
+            article = await self._fetch_article_async(index, total, event)
+            if article is None:
+                return time.perf_counter()
+            fetched.append(article)
+            return await self._summarize_fetched_async(index, total, event, article, deferred)
+
+        try:
+            return await asyncio.wait_for(work(), timeout)
+        except asyncio.TimeoutError:
+            article = fetched[0] if fetched else None
+            if article is None:
+                self._mark_failed(index, total, event, "[处理超时]", f"处理超过 {timeout:g}s 被取消")
+                return time.perf_counter()
+            # 正文已取到、卡在 AI 上：交给 _apply_summary，按配置改用本地摘要
+            print(f"{self._progress(index, total)} 处理超过 {timeout:g}s 被取消")
+            return self._apply_summary(
+                index, total, event, "[处理超时]", self.seen_index.hash_text(article), article
+            )
+
+    async def _fetch_article_async(self, index: int, total: int, event: dict[str, str]) -> str | None:
+        print(f"{self._progress(index, total)} 拉取详情: {event.get('标题', '[无标题]')}")
+        async with self._oa_limit:
+            detail_html = await self._post_async(
+                event["链接"], self.payload, cache=True, refresh=self._needs_refresh(event)
+            )
+        if not detail_html:
+            self._mark_failed(index, total, event, "[获取摘要失败]", "详情获取失败")
+            return None
+        # 正文抽取是 CPU 密集的 HTML 解析，放到线程里避免阻塞事件循环
+        return await asyncio.to_thread(self._clean_html, detail_html)
+
+    async def _summarize_fetched_async(
+        self, index: int, total: int, event: dict[str, str], article: str, deferred: Deferred | None
+    ) -> float:
+        content_hash = self.seen_index.hash_text(article)
+        try:
+            finished = self._resolve_without_ai(index, total, event, article, content_hash, deferred)
+            if finished is not None:
+                return finished
+            waiting = self._awaiting.pop(event["链接"], None)
+            summary = self._reused_summary(index, total, await asyncio.wrap_future(waiting)) if waiting else None
+            if summary is None:
+                summary = await self._summarize_article_async(article)
+            return self._apply_summary(index, total, event, summary, content_hash, article)
+        finally:
+            self._settle(event["链接"], None)
+
+    async def _summarize_article_async(self, article: str) -> str | None:
+        async with self._ai_limit:
+            summary = await self._call_ai_async(article)
+        self._remember_summary(article, summary)
+        return summary
+
+    async def _summarize_batch_async(self, batch: Deferred, total: int) -> float:
+        articles = [article for _, _, article, _ in batch]
+        if len(batch) == 1:
+            results = None
+        else:
+            async with self._ai_limit:
+                results = await self._call_ai_batch_async(articles)
+            if results is None:
+                print(f"批量摘要解析失败，{len(batch)} 条通知改为逐条生成")
+
+        moment = time.perf_counter()
+        for position, (index, event, article, content_hash) in enumerate(batch, start=1):
+            summary = (results or {}).get(str(position))
+            if summary:
+                self.summary_cache.put(self._cache_key(article), summary)
+            else:
+                summary = await self._summarize_article_async(article)
+            moment = self._apply_summary(index, total, event, summary, content_hash, article)
+        return moment
+
+    # ------------------------------------------------------------------
+    # HTTP layer
+    # ------------------------------------------------------------------
+    def _client_timeout(self, seconds: float) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.retry.timeout(seconds))
+
+    async def _post_async(
+        self, url: str, data: dict[str, str] | None = None, cache: bool = False, refresh: bool = False
+    ) -> str | None:
+        kind = "listing" if url == self.listing_url else "detail"
+        cached, fresh = self._lookup_page(url, cache, refresh)
+        if fresh is not None:
+            return fresh
+        headers = cached.conditional_headers() if cached else None
+
+        async def attempt() -> str:
+            async with self._aio.post(url, data=data, headers=headers or None, timeout=self._client_timeout(30)) as response:
+                body = await response.read()
+                METRICS.inc("oa_response_bytes_total", len(body), kind=kind)
+                if response.status == 304 and cached is not None:
+                    return self._revalidated(url, cached)
+                self._raise_for_status(response.status, response.headers)
+                text = body.decode(response.charset or "utf-8", errors="replace")
+                if cache:
+                    self._store_page(url, cached, text, response.headers)
+                return text
+
+        try:
+            with METRICS.timed("oa_request", kind=kind):
+                return await self.retry.call_async(attempt, self._classify_async_error, f"请求 {url}", service="oa")
+        except HTTPStatusError as exc:
+            print(f"请求失败，状态码: {exc.status_code}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, DeadlineExceeded) as exc:
+            print(f"请求 {url} 失败: {exc!r}")
+        return None
+
+    @staticmethod
+    def _classify_async_error(exc: Exception) -> tuple[bool, float | None]:
+        """与 ``_classify_error`` 相同的规则，适配 aiohttp 的异常类型。"""
+        if isinstance(exc, HTTPStatusError):
+            return exc.transient, exc.retry_after
+        if isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+            return True, None
+        if isinstance(exc, ValueError):
+            return True, None
+        return False, None
+
+    async def _call_ai_async(self, content: str) -> str | None:
+        headers = dict(self.config.ai_headers)
+        if "Authorization" not in headers:
+            print("AI API_KEY 未配置，跳过摘要生成")
+            return "[AI 未配置]"
+
+        payload = self._ai_payload(content)
+        try:
+            with METRICS.timed("ai_request", mode="stream" if self.config.ai_stream else "json"):
+                if self.config.ai_stream:
+                    payload["stream"] = True
+                    content = await self._request_ai_stream_async(payload, headers, timeout=60)
+                else:
+                    data = await self._request_ai_async(payload, headers, timeout=60)
+        except asyncio.TimeoutError:
+            print("AI API请求超时")
+            return "[AI请求超时]"
+        except DeadlineExceeded as exc:
+            print(exc)
+            return "[AI请求超时]"
+        except aiohttp.ClientConnectionError:
+            print("AI API连接错误")
+            return "[AI连接失败]"
+        except HTTPStatusError as exc:
+            print(f"AI API返回错误状态码: {exc.status_code}")
+            return "[AI服务异常]"
+        except ValueError as exc:
+            print(f"解析AI API返回的JSON时出错: {exc}")
+            return "[AI返回解析失败]"
+        except aiohttp.ClientError as exc:
+            print(f"调用AI API时发生错误: {exc}")
+            return "[AI调用失败]"
+
+        if not self.config.ai_stream:
+            choices = data.get("choices") or []
+            if not choices:
+                print("AI API返回格式异常: 没有choices字段")
+                return "[AI返回格式异常]"
+            content = choices[-1]["message"].get("content", "")
+        return self._tidy_summary(content)
+
+    async def _request_ai_async(self, payload: dict, headers: dict[str, str], timeout: float) -> dict:
+        async def attempt() -> dict:
+            await self.ai_limiter.acquire_async()
+            async with self._aio.post(
+                self.ai_url, json=payload, headers=headers, timeout=self._client_timeout(timeout)
+            ) as response:
+                body = await response.read()
+                METRICS.inc("ai_response_bytes_total", len(body))
+                self._raise_for_status(response.status, response.headers)
+                return json.loads(body)
+
+        return await self.retry.call_async(attempt, self._classify_async_error, "AI API", service="ai")
+
+    async def _request_ai_stream_async(self, payload: dict, headers: dict[str, str], timeout: float) -> str:
+        async def attempt() -> str:
+            await self.ai_limiter.acquire_async()
+            started = time.perf_counter()
+            collector = StreamCollector(started, self.config.ai_summary_max_chars)
+            async with self._aio.post(
+                self.ai_url, json=payload, headers=headers, timeout=self._client_timeout(timeout)
+            ) as response:
+                self._raise_for_status(response.status, response.headers)
+                async for raw in response.content:
+                    if collector.feed(raw.decode("utf-8").strip()):
+                        break
+            text, first_token, truncated = collector.result()
+            self._record_stream(text, first_token, time.perf_counter() - started, truncated)
+            return text
+
+        return await self.retry.call_async(attempt, self._classify_async_error, "AI API", service="ai")
+
+    async def _call_ai_batch_async(self, articles: list[str]) -> dict[str, str] | None:
+        headers = dict(self.config.ai_headers)
+        if "Authorization" not in headers:
+            return None
+
+        try:
+            with METRICS.timed("ai_request", mode="batch"):
+                data = await self._request_ai_async(self._batch_payload(articles), headers, timeout=120)
+                choices = data.get("choices") or []
+                text = choices[-1]["message"].get("content", "") if choices else ""
+        except (aiohttp.ClientError, asyncio.TimeoutError, HTTPStatusError, DeadlineExceeded, ValueError, KeyError) as exc:
+            print(f"批量摘要请求失败: {exc!r}")
+            return None
+        return self._parse_batch_reply(text)
+
+
+__all__ = ["AsyncOA"]
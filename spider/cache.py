@@ -0,0 +1,105 @@
+"""Persistent summary cache keyed by article content, model and prompt."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from common.metrics import METRICS
+
+
+class SummaryCache:
+    """SQLite-backed cache so identical notices are summarized only once."""
+
+    def __init__(self, db_path: Path, max_bytes: int, max_age_days: int) -> None:
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON summaries(accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(article: str, model: str, system_prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, article):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.max_age:
+                self._conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                METRICS.inc("summary_cache_lookups_total", result="hit")
+                return row[0]
+            self.misses += 1
+            METRICS.inc("summary_cache_lookups_total", result="miss")
+            return None
+
+    def put(self, key: str, summary: str) -> None:
+        now = time.time()
+        size = len(summary.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, summary, size, now, now),
+            )
+            self._conn.commit()
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones above ``max_bytes``."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.max_age,)
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+            if total > self.max_bytes:
+                doomed: list[tuple[str]] = []
+                for key, size in self._conn.execute(
+                    "SELECT key, size FROM summaries ORDER BY accessed_at"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM summaries WHERE key = ?", doomed)
+            self._conn.commit()
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        ratio = self.hits / lookups if lookups else 0.0
+        return f"摘要缓存命中 {self.hits}，未命中 {self.misses}，命中率 {ratio:.0%}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["SummaryCache"]
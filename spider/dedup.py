@@ -0,0 +1,188 @@
+"""Near-duplicate detection for re-posted and corrected notices.
+
+Two signals are used:
+
+* a normalized title key (punctuation, whitespace and markers such as
+  ``【更正】`` or ``（重发）`` removed) adds same-day notices with the same
+  title as extra candidates; it never merges anything on its own, because
+  generic titles such as "讲座通知" are shared by unrelated notices;
+* a MinHash signature over character shingles of the cleaned article,
+  indexed with LSH banding in SQLite, finds near-identical texts across the
+  current day and a window of recent days. Each lookup only touches the
+  buckets of its own bands, so it stays fast as the window grows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable
+
+# 标题中不影响含义的标记与符号
+_TITLE_MARKERS = re.compile(r"[【\[（(](?:更正|更新|重发|补充|修订|修改|转发|最新)[^】\]）)]{0,6}[】\]）)]")
+_TITLE_NOISE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+class Deduplicator:
+    """MinHash/LSH index of recent articles plus the duplicate links already resolved."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        window_days: int,
+        threshold: float,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle: int = 4,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.window_days = window_days
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        # 固定种子，保证签名在多次运行之间可比较
+        seeded = random.Random(0x5EED)
+        self._masks = [seeded.getrandbits(64) for _ in range(num_perm)]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                url TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands_bucket ON bands(band, bucket);
+            CREATE INDEX IF NOT EXISTS idx_bands_url ON bands(url);
+            CREATE TABLE IF NOT EXISTS duplicates (
+                url TEXT PRIMARY KEY,
+                canonical TEXT NOT NULL,
+                date TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self.prune()
+
+    @staticmethod
+    def title_key(title: str) -> str:
+        title = _TITLE_MARKERS.sub("", title.strip())
+        return _TITLE_NOISE.sub("", title).lower()
+
+    def signature(self, text: str) -> list[int]:
+        text = _TITLE_NOISE.sub("", text)
+        if len(text) < self.shingle:
+            text = text.ljust(self.shingle, "\0")
+        hashes = {
+            int.from_bytes(hashlib.blake2b(text[i:i + self.shingle].encode("utf-8"), digest_size=8).digest(), "big")
+            for i in range(len(text) - self.shingle + 1)
+        }
+        return [min(map(mask.__xor__, hashes)) for mask in self._masks]
+
+    @staticmethod
+    def similarity(left: list[int], right: list[int]) -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return sum(a == b for a, b in zip(left, right)) / len(left)
+
+    def find(
+        self, url: str, signature: list[int], date: str, extra: Iterable[str] = ()
+    ) -> tuple[str, str, float] | None:
+        """Best indexed article (other than ``url``) within the window whose similarity reaches the threshold.
+
+        ``extra`` adds candidates beyond the LSH buckets (e.g. notices with the
+        same title). Returns ``(url, date, score)`` of the match.
+        """
+        oldest = self._oldest(date)
+        with self._lock:
+            candidates: set[str] = set(extra)
+            for band, bucket in enumerate(self._buckets(signature)):
+                candidates.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT url FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+                    )
+                )
+            candidates.discard(url)
+            best: tuple[str, str, float] | None = None
+            for candidate in candidates:
+                row = self._conn.execute(
+                    "SELECT date, signature FROM signatures WHERE url = ?", (candidate,)
+                ).fetchone()
+                if row is None or row[0] < oldest:
+                    continue
+                score = self.similarity(signature, self._unpack(row[1]))
+                if score >= self.threshold and (best is None or score > best[2]):
+                    best = (candidate, row[0], score)
+        return best
+
+    def add(self, url: str, date: str, signature: list[int]) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM bands WHERE url = ?", (url,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (url, date, signature, added_at) VALUES (?, ?, ?, ?)",
+                (url, date, struct.pack(f"<{len(signature)}Q", *signature), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (band, bucket, url) VALUES (?, ?, ?)",
+                [(band, bucket, url) for band, bucket in enumerate(self._buckets(signature))],
+            )
+            self._conn.commit()
+
+    def mark_duplicate(self, url: str, canonical: str, date: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO duplicates (url, canonical, date) VALUES (?, ?, ?)", (url, canonical, date)
+            )
+            self._conn.commit()
+
+    def canonical(self, url: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT canonical FROM duplicates WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def prune(self) -> None:
+        """Forget signatures indexed longer ago than the window; resolved duplicate links are kept."""
+        cutoff = time.time() - self.window_days * 86400
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM bands WHERE url IN (SELECT url FROM signatures WHERE added_at < ?)", (cutoff,)
+            )
+            self._conn.execute("DELETE FROM signatures WHERE added_at < ?", (cutoff,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _buckets(self, signature: list[int]) -> list[str]:
+        return [
+            hashlib.blake2b(
+                struct.pack(f"<{self.rows}Q", *signature[band * self.rows:(band + 1) * self.rows]), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    def _oldest(self, date: str) -> str:
+        return (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=self.window_days)).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _unpack(blob: bytes) -> list[int]:
+        return list(struct.unpack(f"<{len(blob) // 8}Q", blob))
+
+
+__all__ = ["Deduplicator"]
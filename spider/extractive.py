@@ -0,0 +1,91 @@
+"""Local extractive summaries for short notices and AI outages."""
+
+from __future__ import annotations
+
+import math
+import re
+
+# 句末标点之后切分，保留标点
+_END_MARKS = "。！？!?；;"
+_SENTENCE_END = re.compile(f"(?<=[{_END_MARKS}])")
+_TOKEN_NOISE = re.compile(r"[\W_]+", re.UNICODE)
+# 通知中不携带信息的套话
+_BOILERPLATE = re.compile(r"^(特此(通知|公告|公示)|附件[:：]?.*|以上.{0,4}请.{0,6}知悉|联系人[:：]?)[。！]?$")
+_DAMPING = 0.85
+
+
+def summarize_extractive(text: str, max_chars: int = 200, max_sentences: int = 3) -> str:
+    """Pick the most central sentences of ``text`` with TextRank, kept in original order.
+
+    Sentences are compared by shared character bigrams, which works for
+    Chinese without a word segmenter. Text that already fits in
+    ``max_chars`` is returned whole apart from boilerplate lines.
+    """
+    sentences = _sentences(text)
+    if not sentences:
+        return ""
+    if sum(map(len, sentences)) <= max_chars:
+        return "".join(sentences)
+
+    scores = _textrank([_bigrams(sentence) for sentence in sentences])
+    ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        if len(chosen) >= max_sentences:
+            break
+        if chosen and used + len(sentences[i]) > max_chars:
+            continue
+        chosen.append(i)
+        used += len(sentences[i])
+
+    summary = "".join(sentences[i] for i in sorted(chosen))
+    return summary if len(summary) <= max_chars else summary[: max_chars - 1] + "…"
+
+
+def _sentences(text: str) -> list[str]:
+    sentences: list[str] = []
+    for line in text.splitlines():
+        for sentence in _SENTENCE_END.split(line):
+            sentence = sentence.strip()
+            if len(sentence) >= 2 and not _BOILERPLATE.match(sentence):
+                # 标题等没有句末标点的行补上句号，拼接后不会与下一句粘连
+                sentences.append(sentence if sentence[-1] in _END_MARKS + "：:" else sentence + "。")
+    return sentences
+
+
+def _bigrams(sentence: str) -> set[str]:
+    chars = _TOKEN_NOISE.sub("", sentence)
+    return {chars[i:i + 2] for i in range(len(chars) - 1)} or {chars}
+
+
+def _textrank(tokens: list[set[str]], iterations: int = 50, tolerance: float = 1e-4) -> list[float]:
+    count = len(tokens)
+    # 经典 TextRank 相似度：共同词数 / (log|Si| + log|Sj|)
+    weights = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            overlap = len(tokens[i] & tokens[j])
+            if overlap:
+                norm = math.log(len(tokens[i]) + 1) + math.log(len(tokens[j]) + 1)
+                weights[i][j] = weights[j][i] = overlap / norm
+    out_weight = [sum(row) for row in weights]
+
+    scores = [1.0 / count] * count
+    for _ in range(iterations):
+        updated = [
+            (1 - _DAMPING) / count
+            + _DAMPING * sum(weights[j][i] / out_weight[j] * scores[j] for j in range(count) if weights[j][i])
+            for i in range(count)
+        ]
+        # 孤立句子没有出边，把它们的分数均摊回去，保持总和为 1
+        dangling = sum(scores[j] for j in range(count) if not out_weight[j])
+        updated = [score + _DAMPING * dangling / count for score in updated]
+        converged = max(abs(a - b) for a, b in zip(updated, scores)) < tolerance
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+__all__ = ["summarize_extractive"]
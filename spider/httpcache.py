@@ -0,0 +1,129 @@
+"""On-disk cache of OA detail pages with HTTP revalidation."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from common.metrics import METRICS
+
+
+@dataclass
+class CachedPage:
+    body: str
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """SQLite-backed response cache keyed by URL, bodies stored zlib-compressed.
+
+    Pages that came with ``ETag``/``Last-Modified`` are revalidated with a
+    conditional request; pages without validators are served locally for
+    ``ttl_seconds``. Least recently used entries are evicted once the
+    compressed bodies exceed ``max_bytes``.
+    """
+
+    def __init__(self, db_path: Path, max_bytes: int, ttl_seconds: float) -> None:
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, url: str) -> CachedPage | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedPage(zlib.decompress(row[0]).decode("utf-8"), row[1], row[2], row[3])
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """Pages without validators may be reused without contacting the portal until the TTL runs out."""
+        return not page.has_validators and time.time() - page.stored_at <= self.ttl
+
+    def touch(self, url: str, revalidated: bool = False) -> None:
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._conn.execute(
+                    "UPDATE pages SET accessed_at = ?, stored_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+
+    def put(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified and self.ttl <= 0:
+            return
+        now = time.time()
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, blob, etag, last_modified, len(blob), now, now),
+            )
+            self._conn.commit()
+        METRICS.inc("page_cache_stored_bytes_total", len(blob))
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired pages without validators, then least recently used ones above ``max_bytes``."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM pages WHERE etag IS NULL AND last_modified IS NULL AND stored_at < ?",
+                (time.time() - self.ttl,),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total > self.max_bytes:
+                doomed: list[tuple[str]] = []
+                for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at"):
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((url,))
+                    total -= size
+                self._conn.executemany("DELETE FROM pages WHERE url = ?", doomed)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["CachedPage", "PageCache"]
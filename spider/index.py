@@ -0,0 +1,85 @@
+"""Persistent index of processed notices for incremental crawling."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SeenIndex:
+    """Remember every processed notice by its ``链接`` in SQLite.
+
+    Each entry stores a hash of the listing row, a hash of the cleaned article
+    and the summary status, so later runs only revisit new or changed notices.
+    """
+
+    STATUS_OK = "ok"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notices (
+                url TEXT PRIMARY KEY,
+                date TEXT NOT NULL,
+                listing_hash TEXT NOT NULL,
+                content_hash TEXT,
+                status TEXT NOT NULL,
+                summary TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_notices_date ON notices(date)")
+        self._conn.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def listing_hash(cls, event: dict[str, str]) -> str:
+        return cls.hash_text("\0".join(event.get(key, "") for key in ("标题", "发布单位", "发布日期")))
+
+    def get(self, url: str) -> sqlite3.Row | None:
+        with self._lock:
+            return self._conn.execute("SELECT * FROM notices WHERE url = ?", (url,)).fetchone()
+
+    def is_current(self, event: dict[str, str]) -> sqlite3.Row | None:
+        """Return the stored entry if the listing row is unchanged and was summarized."""
+        row = self.get(event["链接"])
+        if row and row["status"] == self.STATUS_OK and row["listing_hash"] == self.listing_hash(event):
+            return row
+        return None
+
+    def record(self, event: dict[str, str], content_hash: str | None, status: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO notices "
+                "(url, date, listing_hash, content_hash, status, summary, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    event["链接"],
+                    event.get("发布日期", ""),
+                    self.listing_hash(event),
+                    content_hash,
+                    status,
+                    event.get("摘要"),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+__all__ = ["SeenIndex"]
@@ -0,0 +1,104 @@
+"""Incremental reader for GLM server-sent-event (SSE) chat completions."""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Iterable
+
+_OPEN, _CLOSE = "<think>", "</think>"
+
+
+class ThinkFilter:
+    """Drop ``<think>...</think>`` spans from text that arrives in pieces."""
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._in_think = False
+
+    def feed(self, piece: str) -> str:
+        self._pending += piece
+        visible: list[str] = []
+        while self._pending:
+            tag = _CLOSE if self._in_think else _OPEN
+            index = self._pending.find(tag)
+            if index == -1:
+                # 末尾可能是被拆开的半个标签，先留在缓冲区
+                keep = self._partial_suffix(tag)
+                if not self._in_think:
+                    visible.append(self._pending[: len(self._pending) - keep])
+                self._pending = self._pending[len(self._pending) - keep:]
+                break
+            if not self._in_think:
+                visible.append(self._pending[:index])
+            self._pending = self._pending[index + len(tag):]
+            self._in_think = not self._in_think
+        return "".join(visible)
+
+    def flush(self) -> str:
+        rest, self._pending = ("" if self._in_think else self._pending), ""
+        return rest
+
+    def _partial_suffix(self, tag: str) -> int:
+        for size in range(min(len(tag) - 1, len(self._pending)), 0, -1):
+            if tag.startswith(self._pending[-size:]):
+                return size
+        return 0
+
+
+class StreamCollector:
+    """Accumulate visible content from SSE lines fed one at a time.
+
+    ``reasoning_content`` deltas and inline think blocks are discarded as they
+    arrive; :meth:`feed` returns True once ``[DONE]`` or ``max_chars`` is reached.
+    """
+
+    def __init__(self, started: float, max_chars: int) -> None:
+        self.started = started
+        self.max_chars = max_chars
+        self.first_token: float | None = None
+        self.truncated = False
+        self._think = ThinkFilter()
+        self._parts: list[str] = []
+        self._length = 0
+
+    def feed(self, line: str) -> bool:
+        if not line or not line.startswith("data:"):
+            return False
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return True
+        chunk = json.loads(data)
+        for choice in chunk.get("choices") or []:
+            piece = self._think.feed((choice.get("delta") or {}).get("content") or "")
+            if not piece:
+                continue
+            if self.first_token is None and piece.strip():
+                self.first_token = time.perf_counter() - self.started
+            self._parts.append(piece)
+            self._length += len(piece)
+        if self._length >= self.max_chars:
+            self.truncated = True
+            return True
+        return False
+
+    def result(self) -> tuple[str, float | None, bool]:
+        """Return ``(text, time_to_first_token, truncated)``."""
+        if self.truncated:
+            return "".join(self._parts)[: self.max_chars], self.first_token, True
+        return "".join(self._parts) + self._think.flush(), self.first_token, False
+
+
+def read_stream(lines: Iterable[str], started: float, max_chars: int) -> tuple[str, float | None, bool]:
+    """Collect visible content from SSE ``lines`` until done or ``max_chars`` is reached.
+
+    Returns ``(text, time_to_first_token, truncated)``.
+    """
+    collector = StreamCollector(started, max_chars)
+    for line in lines:
+        if collector.feed(line):
+            break
+    return collector.result()
+
+
+__all__ = ["StreamCollector", "ThinkFilter", "read_stream"]
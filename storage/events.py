@@ -0,0 +1,357 @@
+"""Pluggable storage backends for daily event lists."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:  # Windows 没有 fcntl，只能依赖原子替换
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from config.config import Config
+
+Event = dict[str, str]
+
+_DATE_STEM = re.compile(r"\d{4}-\d{2}-\d{2}")
+# 合并后的重复通知在 发布单位 中用顿号列出所有单位
+UNIT_SEPARATOR = "、"
+
+
+def event_units(event: Event) -> list[str]:
+    """The 发布单位 of ``event``; merged duplicates list several units."""
+    return [unit for unit in event.get("发布单位", "").split(UNIT_SEPARATOR) if unit]
+
+
+class EventStore:
+    """Interface shared by the spider (writer) and the sender (reader)."""
+
+    def save_day(self, date: str, events: list[Event]) -> None:
+        raise NotImplementedError
+
+    def load_day(self, date: str) -> list[Event] | None:
+        """Return the events saved for ``date``, or ``None`` if the day is unknown."""
+        raise NotImplementedError
+
+    def has_day(self, date: str) -> bool:
+        return self.load_day(date) is not None
+
+    def latest_day(self) -> str | None:
+        """The most recently written day (not necessarily the newest date)."""
+        raise NotImplementedError
+
+    def days(self) -> list[str]:
+        raise NotImplementedError
+
+    def query(self, unit: str | None = None, date_from: str | None = None, date_to: str | None = None) -> list[Event]:
+        """Events across days, optionally filtered by 发布单位 and a date range.
+
+        ``unit`` matches any of the units of a merged event.
+        """
+        result: list[Event] = []
+        for day in self.days():
+            if (date_from and day < date_from) or (date_to and day > date_to):
+                continue
+            for event in self.load_day(day) or []:
+                if unit is None or unit in event_units(event):
+                    result.append(event)
+        return result
+
+    def close(self) -> None:
+        pass
+
+
+class JsonDirStore(EventStore):
+    """The original layout: one pretty-printed ``<date>.json`` per day.
+
+    A small ``.manifest`` (JSON) next to the files records the event count and
+    write time of every day plus the most recently written day, so lookups
+    never have to glob or stat the whole archive. The cached copy is reloaded
+    whenever the file changes on disk. Every save re-reads and rewrites it
+    while holding an ``fcntl.flock`` on a ``.manifest.lock`` sidecar, so a
+    long-lived process (the watch daemon) and a concurrent cron run or backfill
+    keep each other's entries. Where ``fcntl`` is unavailable (Windows) only
+    threads of one process are serialized.
+    """
+
+    MANIFEST_NAME = ".manifest"
+    LOCK_NAME = ".manifest.lock"
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.manifest_path = directory / self.MANIFEST_NAME
+        self.lock_path = directory / self.LOCK_NAME
+        # 可重入：save_day 持锁期间读取清单可能触发 rebuild_manifest
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._manifest: dict | None = None
+        self._manifest_stamp: tuple[int, int] | None = None
+
+    def path_for(self, date: str) -> Path:
+        return self.directory / f"{date}.json"
+
+    def save_day(self, date: str, events: list[Event]) -> None:
+        self._write_atomic(self.path_for(date), json.dumps(events, ensure_ascii=False, indent=4))
+        with self._lock, self._exclusive():
+            manifest = self._load_manifest(reload=True)
+            manifest["days"][date] = {"count": len(events), "saved_at": time.time()}
+            manifest["latest"] = date
+            self._write_manifest(manifest)
+
+    def load_day(self, date: str) -> list[Event] | None:
+        path = self.path_for(date)
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def has_day(self, date: str) -> bool:
+        with self._lock:
+            if date in self._load_manifest()["days"]:
+                return True
+        # 清单之外手工放入的文件：单次 stat 即可确认
+        return self.path_for(date).exists()
+
+    def latest_day(self) -> str | None:
+        with self._lock:
+            return self._load_manifest()["latest"]
+
+    def days(self) -> list[str]:
+        with self._lock:
+            return sorted(self._load_manifest()["days"])
+
+    def rebuild_manifest(self) -> dict:
+        """Scan the directory once and rewrite the manifest from the files on disk."""
+        with self._lock, self._exclusive():
+            return self._rebuild_manifest()
+
+    def _rebuild_manifest(self) -> dict:
+        days: dict[str, dict] = {}
+        latest: tuple[float, str] | None = None
+        for path in self.directory.glob("*.json"):
+            if not _DATE_STEM.fullmatch(path.stem):
+                continue
+            mtime = path.stat().st_mtime
+            try:
+                with path.open("r", encoding="utf-8") as handle:
+                    count = len(json.load(handle))
+            except (OSError, ValueError):
+                continue
+            days[path.stem] = {"count": count, "saved_at": mtime}
+            if latest is None or mtime > latest[0]:
+                latest = (mtime, path.stem)
+        manifest = {"latest": latest[1] if latest else None, "days": days}
+        self._write_manifest(manifest)
+        return manifest
+
+    def _load_manifest(self, reload: bool = False) -> dict:
+        """Cached manifest, re-read when forced or when another process has rewritten the file."""
+        if self._manifest is None or reload or self._stamp() != self._manifest_stamp:
+            try:
+                with self.manifest_path.open("r", encoding="utf-8") as handle:
+                    self._manifest = json.load(handle)
+                self._manifest_stamp = self._stamp()
+            except FileNotFoundError:
+                self.rebuild_manifest()
+            except (OSError, ValueError):
+                print(f"事件清单 {self.manifest_path} 已损坏，正在重建")
+                self.rebuild_manifest()
+        return self._manifest
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """Hold the cross-process lock on the sidecar file; call with ``_lock`` held."""
+        if fcntl is None or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        with self.lock_path.open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _write_manifest(self, manifest: dict) -> None:
+        self._write_atomic(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+        self._manifest = manifest
+        self._manifest_stamp = self._stamp()
+
+    def _stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = self.manifest_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        # 临时文件名带进程号，多个进程同时写入时不会互相覆盖
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+
+
+class SqliteEventStore(EventStore):
+    """All days in one SQLite database, indexed by date and 发布单位.
+
+    Each unit of a merged event gets its own ``event_units`` row, so unit
+    queries stay on an index.
+
+    With ``export_dir`` set, every saved day is also written as
+    ``<date>.json`` so existing consumers of ``events/`` keep working.
+    """
+
+    def __init__(self, db_path: Path, export_dir: Path | None = None) -> None:
+        self.db_path = db_path
+        self.exporter = JsonDirStore(export_dir) if export_dir else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                date TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (date, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_unit_date ON events(unit, date);
+            CREATE TABLE IF NOT EXISTS event_units (
+                date TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                unit TEXT NOT NULL,
+                PRIMARY KEY (date, position, unit)
+            );
+            CREATE INDEX IF NOT EXISTS idx_event_units_unit_date ON event_units(unit, date);
+            CREATE TABLE IF NOT EXISTS days (
+                date TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                saved_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_days_saved_at ON days(saved_at);
+            """
+        )
+        self._conn.commit()
+        self._backfill_units()
+
+    def _backfill_units(self) -> None:
+        # 旧数据库没有 event_units 表，首次打开时按已有事件补齐
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM event_units LIMIT 1").fetchone() is not None:
+                return
+            rows = self._conn.execute("SELECT date, position, data FROM events").fetchall()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO event_units (date, position, unit) VALUES (?, ?, ?)",
+                [
+                    (date, position, unit)
+                    for date, position, data in rows
+                    for unit in event_units(json.loads(data))
+                ],
+            )
+
+    def save_day(self, date: str, events: list[Event]) -> None:
+        self.save_days({date: events})
+
+    def save_days(self, days: dict[str, list[Event]]) -> None:
+        """Replace several days in one transaction (used by bulk imports)."""
+        now = time.time()
+        with self._lock, self._conn:
+            for date, events in days.items():
+                self._conn.execute("DELETE FROM events WHERE date = ?", (date,))
+                self._conn.execute("DELETE FROM event_units WHERE date = ?", (date,))
+                self._conn.executemany(
+                    "INSERT INTO events (date, position, url, unit, data) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (date, position, event.get("链接", ""), event.get("发布单位", ""),
+                         json.dumps(event, ensure_ascii=False))
+                        for position, event in enumerate(events)
+                    ],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO event_units (date, position, unit) VALUES (?, ?, ?)",
+                    [
+                        (date, position, unit)
+                        for position, event in enumerate(events)
+                        for unit in event_units(event)
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO days (date, count, saved_at) VALUES (?, ?, ?)",
+                    (date, len(events), now),
+                )
+        if self.exporter:
+            for date, events in days.items():
+                self.exporter.save_day(date, events)
+
+    def load_day(self, date: str) -> list[Event] | None:
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM events WHERE date = ? ORDER BY position", (date,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def has_day(self, date: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is not None
+
+    def latest_day(self) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT date FROM days ORDER BY saved_at DESC, date DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def days(self) -> list[str]:
+        with self._lock:
+            return [date for (date,) in self._conn.execute("SELECT date FROM days ORDER BY date")]
+
+    def query(self, unit: str | None = None, date_from: str | None = None, date_to: str | None = None) -> list[Event]:
+        # 按单位查询时从 event_units 出发，走 (unit, date) 索引
+        source = "events AS e"
+        clauses, params = [], []
+        if unit is not None:
+            source = "event_units AS u JOIN events AS e ON e.date = u.date AND e.position = u.position"
+            clauses.append("u.unit = ?")
+            params.append(unit)
+        if date_from:
+            clauses.append("e.date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("e.date <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT e.data FROM {source} {where} ORDER BY e.date, e.position", params
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(config: Config) -> EventStore:
+    """Build the backend selected by ``EVENT_STORE`` (``json`` or ``sqlite``)."""
+    if config.event_store == "sqlite":
+        export_dir = config.events_dir if config.event_store_export_json else None
+        return SqliteEventStore(config.events_dir / "events.sqlite3", export_dir=export_dir)
+    return JsonDirStore(config.events_dir)
+
+
+__all__ = ["EventStore", "JsonDirStore", "SqliteEventStore", "UNIT_SEPARATOR", "event_units", "open_store"]
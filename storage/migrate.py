@@ -0,0 +1,83 @@
+"""Import, export and query the event store.
+
+    uv run python storage/migrate.py import [--source events/]
+    uv run python storage/migrate.py export [--target events/] [--from D] [--to D]
+    uv run python storage/migrate.py query --unit 教务处 --from 2025-09-01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from config.config import Config  # noqa: E402
+from storage.events import JsonDirStore, SqliteEventStore  # noqa: E402
+
+
+def import_json_dir(store: SqliteEventStore, source: Path) -> int:
+    """Bulk-load every ``<date>.json`` in ``source`` into ``store`` in one transaction."""
+    reader = JsonDirStore(source)
+    reader.rebuild_manifest()
+    days: dict[str, list[dict[str, str]]] = {}
+    for day in reader.days():
+        try:
+            days[day] = reader.load_day(day) or []
+        except (OSError, ValueError) as exc:
+            print(f"跳过无法读取的文件 {reader.path_for(day)}: {exc}")
+    store.save_days(days)
+    return sum(len(events) for events in days.values())
+
+
+def export_json_dir(store: SqliteEventStore, target: Path, date_from: str | None, date_to: str | None) -> int:
+    writer = JsonDirStore(target)
+    exported = 0
+    for day in store.days():
+        if (date_from and day < date_from) or (date_to and day > date_to):
+            continue
+        writer.save_day(day, store.load_day(day) or [])
+        exported += 1
+    return exported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="事件存储的导入、导出与查询")
+    sub = parser.add_subparsers(dest="command", required=True)
+    importer = sub.add_parser("import", help="把 events/ 下的JSON文件批量导入SQLite")
+    importer.add_argument("--source", type=Path, help="JSON目录，默认配置中的 EVENTS_DIR")
+    exporter = sub.add_parser("export", help="从SQLite导出兼容的每日JSON文件")
+    exporter.add_argument("--target", type=Path, help="输出目录，默认配置中的 EVENTS_DIR")
+    query = sub.add_parser("query", help="跨日期查询通知")
+    query.add_argument("--unit", help="发布单位")
+    for command in (exporter, query):
+        command.add_argument("--from", dest="date_from", help="起始日期 YYYY-MM-DD")
+        command.add_argument("--to", dest="date_to", help="结束日期 YYYY-MM-DD")
+    args = parser.parse_args()
+
+    config = Config()
+    config.ensure_directories()
+    store = SqliteEventStore(config.events_dir / "events.sqlite3")
+    try:
+        if args.command == "import":
+            source = args.source or config.events_dir
+            count = import_json_dir(store, source)
+            print(f"已从 {source} 导入 {len(store.days())} 天、{count} 条事件到 {store.db_path}")
+        elif args.command == "export":
+            target = args.target or config.events_dir
+            target.mkdir(parents=True, exist_ok=True)
+            count = export_json_dir(store, target, args.date_from, args.date_to)
+            print(f"已导出 {count} 天的JSON文件到 {target}")
+        else:
+            for event in store.query(args.unit, args.date_from, args.date_to):
+                print(json.dumps(event, ensure_ascii=False))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
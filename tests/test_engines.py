@@ -0,0 +1,75 @@
+"""The thread and asyncio engines must save identical events."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from bench.standins import FakeGLM, OAPortal
+from config.config import Config
+from spider.OAP import OA
+
+pytest.importorskip("aiohttp")
+from spider.async_engine import AsyncOA  # noqa: E402
+
+DATE = "2025-09-25"
+NOTICES = 12
+MODES = {
+    "json": {},
+    "stream": {"AI_STREAM": "1"},
+    "batch": {"AI_BATCH": "1", "AI_BATCH_ITEM_MAX_CHARS": "3000", "AI_BATCH_TOKEN_BUDGET": "4000"},
+}
+
+
+@pytest.fixture(scope="module")
+def services():
+    portal, glm = OAPortal(DATE, NOTICES, "2000-01-01"), FakeGLM(0.0, 0.0, 0.0)
+    for server in (portal, glm):
+        server.start()
+    yield portal, glm
+    for server in (portal, glm):
+        server.stop()
+
+
+def _run(engine: type[OA], workdir, monkeypatch, services, settings: dict[str, str]) -> tuple[list[dict], int]:
+    portal, glm = services
+    environment = {
+        "EVENTS_DIR": str(workdir / "events"),
+        "CACHE_DIR": str(workdir / "cache"),
+        "OA_BASE_URL": f"http://127.0.0.1:{portal.port}",
+        "AI_URL": f"http://127.0.0.1:{glm.port}/chat",
+        "API_KEY": "test",
+        "RETRY_ATTEMPTS": "1",
+        "LOCAL_SUMMARY_THRESHOLD": "0",
+        "DEDUP": "0",
+        "AI_STREAM": "0",
+        "AI_BATCH": "0",
+        **settings,
+    }
+    for key, value in environment.items():
+        monkeypatch.setenv(key, value)
+
+    requests_before = glm.requests
+    spider = engine(target_date=DATE, config=Config(env_file=workdir / "env"))
+    try:
+        spider.run()
+    finally:
+        spider.close()
+    events = json.loads((workdir / "events" / f"{DATE}.json").read_text(encoding="utf-8"))
+    return events, glm.requests - requests_before
+
+
+@pytest.mark.parametrize("mode", sorted(MODES))
+def test_engines_save_identical_events(mode, tmp_path, monkeypatch, services):
+    thread_events, thread_requests = _run(OA, tmp_path / "thread", monkeypatch, services, MODES[mode])
+    async_events, async_requests = _run(AsyncOA, tmp_path / "async", monkeypatch, services, MODES[mode])
+
+    assert len(thread_events) == NOTICES
+    assert thread_events == async_events
+    assert not any(OA._is_placeholder(event["摘要"]) for event in thread_events)
+    if mode == "batch":
+        # 批量回复被成功解析时，请求数远少于通知数（解析失败会退回逐条请求）
+        assert thread_requests < NOTICES and async_requests < NOTICES
+    else:
+        assert thread_requests == async_requests == NOTICES